@@ -0,0 +1,102 @@
+"""批量报表：不启动 Streamlit，直接计算看板上的全部表格并落盘。
+
+用法：
+    python batch_report.py --out reports --format parquet
+    python batch_report.py --categories 儿童丙烯 --format csv --jobs 2
+
+每个 (main_category, sub_type) 输出一个目录，包含：
+    summary.json               顶部指标卡（亮点/痛点总提及、健康度、平均星级）
+    dimension_scores           各维度亮点、痛点、满意度、维度评分、机会指数
+    opportunity_ranking        按机会指数排序的维度
+    persona_counts             画像各维度的标签分布
+    sku_dimension_ratings      每个 (人群, SKU, 维度) 的平均评分与命中句数
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from review_analysis import (
+    DATA_MAP, INGEST_WORKERS, SEGMENTER, SENTIMENT_BACKEND, build_report, category_scope, load_sentences, prepare_dataset,
+)
+from segmentation import SEGMENTERS
+from sentiment_backends import SENTIMENT_BACKENDS
+from text_pipeline import init_nltk_resources
+
+FORMATS = ('parquet', 'csv', 'json')
+
+
+def _slug(name):
+    """去掉 emoji 与标点，作为目录名"""
+    return re.sub(r'[^\w\-]+', '_', name).strip('_')
+
+
+def write_table(table, path_stem, fmt):
+    if fmt == 'parquet':
+        table.to_parquet(path_stem + '.parquet', index=False)
+    elif fmt == 'csv':
+        # utf-8-sig 便于 Excel 直接打开中文列名
+        table.to_csv(path_stem + '.csv', index=False, encoding='utf-8-sig')
+    else:
+        table.to_json(path_stem + '.json', orient='records', force_ascii=False, indent=2)
+
+
+def run_category(main_category, data_dir, out_dir, fmt, workers, sentiment=SENTIMENT_BACKEND, segmenter=SEGMENTER):
+    """计算单个 main_category 下所有子类的报表，返回写出的目录列表"""
+    init_nltk_resources()
+    df = load_sentences(data_dir, categories=[main_category], workers=workers, sentiment=sentiment,
+                        segmenter=segmenter)
+    if df.empty:
+        return []
+
+    prepared = prepare_dataset(df, scope=category_scope(main_category, data_dir))
+    written = []
+    for sub_type in df['sub_type'].unique():
+        report = build_report(df, prepared, main_category, sub_type)
+        target = os.path.join(out_dir, _slug(main_category), _slug(sub_type))
+        os.makedirs(target, exist_ok=True)
+
+        summary = {'main_category': main_category, 'sub_type': sub_type, **report.pop('summary')}
+        with open(os.path.join(target, 'summary.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2, default=lambda o: o.item())
+        for name, table in report.items():
+            write_table(table, os.path.join(target, name), fmt)
+        written.append(target)
+    return written
+
+
+def main(argv=None):
+    categories = list(dict.fromkeys(info[0] for info in DATA_MAP.values()))
+    parser = argparse.ArgumentParser(description="离线生成丙烯马克笔评论洞察报表")
+    parser.add_argument('--data-dir', default='.', help="工作簿所在目录")
+    parser.add_argument('--out', default='reports', help="报表输出目录")
+    parser.add_argument('--format', choices=FORMATS, default='parquet', help="表格输出格式")
+    parser.add_argument('--categories', nargs='+', choices=categories, default=categories, help="只计算指定类目")
+    parser.add_argument('--jobs', type=int, default=len(categories), help="并行计算的类目数")
+    parser.add_argument('--sentiment', choices=list(SENTIMENT_BACKENDS), default=SENTIMENT_BACKEND, help="情感打分后端")
+    parser.add_argument('--segmenter', choices=SEGMENTERS, default=SEGMENTER, help="分句器")
+    args = parser.parse_args(argv)
+
+    jobs = max(1, min(args.jobs, len(args.categories)))
+    # 各类目进程平分分句打分的进程数，避免嵌套进程池超额占用 CPU
+    workers = max(1, INGEST_WORKERS // jobs)
+    tasks = [(c, args.data_dir, args.out, args.format, workers, args.sentiment, args.segmenter) for c in args.categories]
+
+    if jobs == 1:
+        results = [run_category(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(run_category, *zip(*tasks)))
+
+    written = [path for paths in results for path in paths]
+    os.makedirs(args.out, exist_ok=True)
+    with open(os.path.join(args.out, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump({'format': args.format, 'reports': written}, f, ensure_ascii=False, indent=2)
+    for path in written:
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""摄取与分析热路径基准测试。
+
+按 kids_sales.xlsx 的列结构生成合成评论工作簿（默认 1 万 / 10 万句，可选 100 万句），
+分阶段计时并记录峰值内存，结果写成 JSON 便于逐次对比回归。
+
+用法：
+    python benchmarks/bench_pipeline.py                       # 10k + 100k
+    python benchmarks/bench_pipeline.py --sizes 10k 1m --workers 8
+    python benchmarks/bench_pipeline.py --sentiment lexicon   # 批量向量化情感打分
+    python benchmarks/bench_pipeline.py --segmenter fast      # 整批正则分句
+    python benchmarks/bench_pipeline.py --compare benchmarks/results/<上一次>.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dictionaries import CLASSIFICATION_RULES, FEATURE_DIC, USER_CATEGORY_MAPPING  # noqa: E402
+from keyword_matcher import KeywordMatcher  # noqa: E402
+from review_analysis import (  # noqa: E402
+    ALL_ROLES, INGEST_WORKERS, SEGMENTER, SENTIMENT_BACKEND, analyze_sentiments, attach_sku_spec, build_persona_features,
+    build_sku_cube, extract_advanced_features, read_reviews, sku_bubble_metrics, split_reviews,
+)
+from segmentation import SEGMENTERS  # noqa: E402
+from sentiment_backends import SENTIMENT_BACKENDS  # noqa: E402
+from text_pipeline import init_nltk_resources  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BENCH_DIR, "data")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+BENCH_INFO = ("基准测试", "合成数据")
+
+# 与 kids_sales.xlsx 完全一致的列
+COLUMNS = ['Asin', 'Title', 'English Title', 'Content', 'English Content', 'Verified Purchase', 'Model',
+           'Rating', 'Helpful', 'Images', 'Images URL', 'Videos', 'Videos URL', 'Reviews URL', 'Author',
+           'Avatar URL', 'Author Homepage', 'Nation', 'Date']
+
+FILLER = [
+    "i bought these for a project last week", "the set arrived on time", "we tried them on paper and wood",
+    "honestly not sure what to think yet", "they are about what you would expect", "my order came in a box",
+    "i have used many brands before", "will update this review later",
+]
+
+
+def generate_reviews(n_sentences, seed=0):
+    """生成约 n_sentences 句的合成评论表；句子里随机混入词库关键词，保证各维度都有命中"""
+    rng = random.Random(seed)
+    keywords = [k for sub in FEATURE_DIC.values() for ks in sub.values() for k in ks]
+    persona = [k for sub in CLASSIFICATION_RULES.values() for ks in sub.values() for k in ks]
+    asins = list(USER_CATEGORY_MAPPING) + ["B0UNMAPPED1", "B0UNMAPPED2"]
+
+    rows, total = [], 0
+    while total < n_sentences:
+        n = rng.randint(1, 5)
+        sentences = []
+        for _ in range(n):
+            r = rng.random()
+            if r < 0.5:
+                sentences.append(f"the {rng.choice(keywords)} is {rng.choice(['great', 'terrible', 'okay', 'amazing', 'bad'])}.")
+            elif r < 0.7:
+                sentences.append(f"as a {rng.choice(persona)} i {rng.choice(['love', 'hate', 'use'])} them.")
+            else:
+                sentences.append(rng.choice(FILLER).capitalize() + ".")
+        total += n
+        i = len(rows)
+        rows.append({
+            'Asin': rng.choice(asins), 'Title': "Synthetic review", 'English Title': None,
+            'Content': " ".join(sentences), 'English Content': None, 'Verified Purchase': "Y",
+            'Model': "Size:24pcs", 'Rating': rng.choices([1, 2, 3, 4, 5], weights=[6, 4, 8, 17, 65])[0],
+            'Helpful': float(rng.randint(0, 20)), 'Images': None, 'Images URL': None, 'Videos': None,
+            'Videos URL': None, 'Reviews URL': f"https://www.amazon.com/gp/customer-reviews/RSYN{seed}X{i:08d}",
+            'Author': f"user{i}", 'Avatar URL': None, 'Author Homepage': None, 'Nation': "US",
+            'Date': datetime(2024, 1, 1) + pd.Timedelta(minutes=i),
+        })
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def ensure_workbook(size_name, seed):
+    """合成工作簿按 (规模, 种子) 缓存在 benchmarks/data，避免每次都重新写 xlsx"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"synthetic_{size_name}_seed{seed}.xlsx")
+    if not os.path.exists(path):
+        generate_reviews(SIZES[size_name], seed).to_excel(path, index=False)
+    return path
+
+
+class StageRecorder:
+    """逐阶段记录耗时、行数与峰值内存"""
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        record = {'stage': name}
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        yield record
+        record['seconds'] = round(time.perf_counter() - start, 4)
+        if self.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            record['peak_mb'] = round((peak - base) / 2**20, 2)
+        record['maxrss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        self.stages.append(record)
+
+
+def run_size(size_name, seed, workers, trace_memory, sentiment=SENTIMENT_BACKEND, segmenter=SEGMENTER):
+    path = ensure_workbook(size_name, seed)
+    rec = StageRecorder(trace_memory)
+    if trace_memory:
+        tracemalloc.start()
+
+    with rec.stage('read_excel') as r:
+        reviews, col_name = read_reviews(path)
+        r['rows'] = len(reviews)
+    with rec.stage('split_and_score') as r:
+        df = attach_sku_spec(split_reviews(reviews, col_name, BENCH_INFO, workers=workers, sentiment=sentiment,
+                                             segmenter=segmenter))
+        r['rows'] = len(df)
+    with rec.stage('tag_hits') as r:
+        tag_hits = KeywordMatcher(FEATURE_DIC).hit_matrix(df['s_text'])
+        r['rows'] = len(tag_hits.indices)
+    with rec.stage('persona_features') as r:
+        persona = build_persona_features(df['s_text'], CLASSIFICATION_RULES, cache=False)
+        r['rows'] = len(persona)
+    with rec.stage('analyze_sentiments') as r:
+        r['rows'] = len(analyze_sentiments(df, tag_hits))
+    with rec.stage('extract_advanced_features') as r:
+        enriched = extract_advanced_features(df, persona)
+        r['rows'] = len(enriched)
+    with rec.stage('sku_cube') as r:
+        sku_cube, sku_order = build_sku_cube(df, persona['feat_User_Role'], tag_hits, FEATURE_DIC)
+        r['rows'] = len(sku_cube)
+    with rec.stage('bubble_metrics') as r:
+        roles = enriched.loc[enriched['feat_User_Role'] != "未提及", 'feat_User_Role'].value_counts().head(3).index.tolist()
+        dims = list(FEATURE_DIC)[:3]
+        r['rows'] = sum(len(sku_bubble_metrics(sku_cube, sku_order, *BENCH_INFO, role, dims)[1]) for role in [ALL_ROLES] + roles)
+
+    if trace_memory:
+        tracemalloc.stop()
+    return [{'size': size_name, **s} for s in rec.stages]
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def compare(current, previous_path):
+    """与上一次结果逐阶段对比，打印耗时比值（>1 表示变慢）"""
+    with open(previous_path, encoding='utf-8') as f:
+        previous = {(r['size'], r['stage']): r for r in json.load(f)['results']}
+    print(f"\n对比 {previous_path}")
+    for r in current:
+        old = previous.get((r['size'], r['stage']))
+        if old and old['seconds'] > 0:
+            print(f"  {r['size']:>5} {r['stage']:<26} {old['seconds']:>9.3f}s -> {r['seconds']:>9.3f}s  x{r['seconds'] / old['seconds']:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="摄取与分析热路径基准测试")
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['10k', '100k'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=INGEST_WORKERS, help="分句与情感打分的进程数")
+    parser.add_argument('--sentiment', choices=list(SENTIMENT_BACKENDS), default=SENTIMENT_BACKEND, help="情感打分后端")
+    parser.add_argument('--segmenter', choices=SEGMENTERS, default=SEGMENTER, help="分句器")
+    parser.add_argument('--no-tracemalloc', action='store_true', help="关闭 tracemalloc（计时更准，只报告进程级峰值 RSS）")
+    parser.add_argument('--out', default=None, help="结果 JSON 路径，默认写入 benchmarks/results/")
+    parser.add_argument('--compare', default=None, help="与之前的结果 JSON 对比")
+    args = parser.parse_args(argv)
+
+    init_nltk_resources()
+    results = []
+    for size_name in args.sizes:
+        for r in run_size(size_name, args.seed, args.workers, not args.no_tracemalloc, args.sentiment,
+                          args.segmenter):
+            results.append(r)
+            print(f"{r['size']:>5} {r['stage']:<26} {r['seconds']:>9.3f}s  rows={r.get('rows')}  peak={r.get('peak_mb', '-')}MB")
+
+    payload = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'workers': args.workers,
+        'sentiment': args.sentiment,
+        'segmenter': args.segmenter,
+        'seed': args.seed,
+        'tracemalloc': not args.no_tracemalloc,
+        'results': results,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已写入 {out}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
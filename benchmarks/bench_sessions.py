@@ -0,0 +1,75 @@
+"""并发会话基准：同一进程内同时打开多个看板会话，对比总耗时与共享缓存的命中情况。
+
+共享缓存生效时，N 个会话同时查看同一类目，分析结果只计算一次，其余会话直接复用。
+
+用法：
+    python benchmarks/bench_sessions.py                      # 1 个会话 vs 10 个并发会话
+    python benchmarks/bench_sessions.py --sessions 20 --category 大容量丙烯
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from result_cache import cache_stats, get_cache  # noqa: E402
+
+APP = os.path.join(ROOT, "app.py")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def run_session(category):
+    at = AppTest.from_file(APP, default_timeout=1800).run()
+    if category is not None:
+        at.sidebar.radio[0].set_value(category).run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+
+def run_round(sessions, category):
+    """清空共享缓存后同时启动 sessions 个会话，返回总耗时与缓存统计"""
+    for name in ("slice_results", "bubble_points"):
+        get_cache(name).clear()
+    before = {s['cache']: s for s in cache_stats()}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        list(pool.map(lambda _: run_session(category), range(sessions)))
+    seconds = time.perf_counter() - start
+    stats = []
+    for s in cache_stats():
+        prev = before.get(s['cache'], {})
+        stats.append({**s, **{k: s[k] - prev.get(k, 0) for k in ('hits', 'disk_hits', 'misses')}})
+    return {'sessions': sessions, 'seconds': round(seconds, 3), 'caches': stats}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="并发会话基准")
+    parser.add_argument('--sessions', type=int, default=10, help="并发会话数")
+    parser.add_argument('--category', default=None, help="会话切换到的类目，默认停留在第一个类目")
+    parser.add_argument('--out', default=None, help="结果 JSON 路径，默认写入 benchmarks/results/")
+    args = parser.parse_args(argv)
+
+    os.chdir(ROOT)
+    run_session(args.category)  # 预热：加载数据与命中矩阵等 st.cache_data 缓存，只测分析结果的计算与复用
+    rounds = [run_round(1, args.category), run_round(args.sessions, args.category)]
+    for r in rounds:
+        caches = "  ".join(f"{c['cache']}: 命中 {c['hits']} / 未命中 {c['misses']}" for c in r['caches'])
+        print(f"{r['sessions']:>3} 个会话  {r['seconds']:>8.2f}s  {caches}")
+
+    payload = {'timestamp': datetime.now().isoformat(timespec='seconds'), 'category': args.category, 'rounds': rounds}
+    out = args.out or os.path.join(RESULTS_DIR, f"bench_sessions_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已写入 {out}")
+
+
+if __name__ == "__main__":
+    main()
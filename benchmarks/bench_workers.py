@@ -0,0 +1,131 @@
+"""多进程内存基准：同时启动 N 个看板工作进程，各自完整渲染一次页面，统计每个进程的内存。
+
+模拟负载均衡后面的多个 Streamlit 进程。句子明细表与命中矩阵是内存映射的共享文件（见 shared_store），
+页面由各进程共享：每个进程私有的匿名内存（Anonymous）不应随数据重复增长，Pss 把共享页面按进程数
+均摊，所有进程的 Pss 之和即这组进程实际占用的物理内存。
+
+读取 /proc/<pid>/smaps_rollup，只支持 Linux。
+
+用法：
+    python benchmarks/bench_workers.py                           # 1 / 2 / 4 个进程，真实工作簿
+    python benchmarks/bench_workers.py --synthetic 100k --workers 1 4 8
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_pipeline import DATA_DIR, SIZES, ensure_workbook  # noqa: E402
+from review_analysis import DATA_MAP  # noqa: E402
+
+APP = os.path.join(ROOT, "app.py")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+MEMORY_FIELDS = {'Rss': 'rss_mb', 'Pss': 'pss_mb', 'Anonymous': 'anonymous_mb'}
+
+
+def memory_usage():
+    usage = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            field, _, value = line.partition(":")
+            if field in MEMORY_FIELDS:
+                usage[MEMORY_FIELDS[field]] = round(int(value.split()[0]) / 1024, 1)
+    return usage
+
+
+def synthetic_data_dir(size_name, seed):
+    """DATA_MAP 的每个工作簿换成一份合成工作簿（各用不同种子），放在单独目录里（缓存目录也随之独立）"""
+    path = os.path.join(DATA_DIR, f"workers_{size_name}_seed{seed}")
+    os.makedirs(path, exist_ok=True)
+    for i, filename in enumerate(DATA_MAP):
+        if not os.path.exists(os.path.join(path, filename)):
+            shutil.copyfile(ensure_workbook(size_name, seed + i), os.path.join(path, filename))
+    return path
+
+
+def worker(data_dir, rounds, loaded, done, results):
+    """一个看板进程：渲染页面 rounds 次，等所有进程都加载完后同时统计内存"""
+    os.environ['WARM_UP_ON_START'] = "0"  # 只统计渲染当前类目所需的数据
+    os.chdir(data_dir)
+    from streamlit.testing.v1 import AppTest
+
+    try:
+        at = AppTest.from_file(APP, default_timeout=1800)
+        for _ in range(rounds):
+            at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        loaded.wait()
+        results.put(memory_usage())
+        done.wait()
+    except Exception as e:  # noqa: BLE001 -- 把错误交给主进程，并让其它进程不再等待
+        results.put({'error': repr(e)})
+        loaded.abort()
+        done.abort()
+
+
+def run_workers(n, data_dir, rounds):
+    ctx = multiprocessing.get_context("spawn")
+    loaded, done, results = ctx.Barrier(n), ctx.Barrier(n + 1), ctx.Queue()
+    processes = [ctx.Process(target=worker, args=(data_dir, rounds, loaded, done, results)) for _ in range(n)]
+    for p in processes:
+        p.start()
+    usages = [results.get() for _ in range(n)]
+    errors = [u['error'] for u in usages if 'error' in u]
+    if not errors:
+        done.wait()
+    for p in processes:
+        p.join()
+    if errors:
+        raise RuntimeError(errors[0])
+    return {
+        'workers': n,
+        'per_worker': {field: round(sum(u[field] for u in usages) / n, 1) for field in MEMORY_FIELDS.values()},
+        'total_pss_mb': round(sum(u['pss_mb'] for u in usages), 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多进程内存基准")
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4], help="同时运行的看板进程数")
+    parser.add_argument('--data-dir', default=ROOT, help="工作簿所在目录")
+    parser.add_argument('--synthetic', choices=list(SIZES), default=None, help="改用合成工作簿（每个工作簿各生成一份）")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rounds', type=int, default=2, help="每个进程渲染页面的次数")
+    parser.add_argument('--out', default=None, help="结果 JSON 路径，默认写入 benchmarks/results/")
+    args = parser.parse_args(argv)
+
+    data_dir = synthetic_data_dir(args.synthetic, args.seed) if args.synthetic else os.path.abspath(args.data_dir)
+    # 先单独渲染一次，把各级磁盘缓存建好，之后只统计读取缓存的常驻内存
+    run_workers(1, data_dir, 1)
+
+    results = []
+    for n in args.workers:
+        r = run_workers(n, data_dir, args.rounds)
+        results.append(r)
+        w = r['per_worker']
+        print(f"{n:>2} 个进程  每进程 Rss={w['rss_mb']:>7.1f}MB  Anonymous={w['anonymous_mb']:>7.1f}MB  "
+              f"Pss={w['pss_mb']:>7.1f}MB  合计 Pss={r['total_pss_mb']:>8.1f}MB")
+
+    payload = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'data_dir': data_dir,
+        'synthetic': args.synthetic,
+        'rounds': args.rounds,
+        'results': results,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"workers_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已写入 {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""评论重复率报告：统计各工作簿内、工作簿之间的重复评论，以及摄取时去重省下的 NLP 工作量。
+
+按 DATA_MAP 顺序（即 load_sentences 的摄取顺序）逐个工作簿统计：
+- 工作簿内精确重复、与前面工作簿精确重复的评论数（摄取时直接复用，不再分句打分）；
+- 与其它每个工作簿共有的评论数；
+- MinHash 近似重复（只差标点、空格或个别词，不能复用 NLP 结果）的评论数，并附若干样例。
+
+用法：
+    python benchmarks/duplication_report.py
+    python benchmarks/duplication_report.py --categories 儿童丙烯 --threshold 0.9
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dedup import NEAR_DUPLICATE_THRESHOLD, content_keys, near_duplicate_groups  # noqa: E402
+from review_analysis import DATA_MAP, iter_review_batches  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def main(argv=None):
+    categories = list(dict.fromkeys(info[0] for info in DATA_MAP.values()))
+    parser = argparse.ArgumentParser(description="评论重复率报告")
+    parser.add_argument('--data-dir', default=ROOT, help="工作簿所在目录")
+    parser.add_argument('--categories', nargs='+', choices=categories, default=categories, help="只统计指定类目")
+    parser.add_argument('--threshold', type=float, default=NEAR_DUPLICATE_THRESHOLD, help="近似重复的 Jaccard 阈值")
+    parser.add_argument('--examples', type=int, default=10, help="记录的近似重复样例条数")
+    parser.add_argument('--out', default=None, help="结果 JSON 路径，默认写入 benchmarks/results/")
+    args = parser.parse_args(argv)
+
+    frames = []
+    for filename, (main_category, sub_type) in DATA_MAP.items():
+        path = os.path.join(args.data_dir, filename)
+        if not os.path.exists(path) or main_category not in args.categories:
+            continue
+        texts = []
+        for batch, col_name in iter_review_batches(path):
+            texts.extend(batch[col_name].dropna().tolist())
+        frames.append(pd.DataFrame({'workbook': filename, 'main_category': main_category, 'sub_type': sub_type,
+                                    'text': pd.Series(texts, dtype=object)}))
+    reviews = pd.concat(frames, ignore_index=True)
+    reviews['content_key'] = content_keys(reviews['text'])
+
+    start = time.perf_counter()
+    group = near_duplicate_groups(reviews['text'].tolist(), threshold=args.threshold)
+    minhash_seconds = time.perf_counter() - start
+
+    # 摄取顺序下，某条评论的内容是否已经出现过（工作簿内 / 前面的工作簿）
+    first_seen = reviews.groupby('content_key', sort=False)['workbook'].transform('first')
+    repeated = reviews['content_key'].duplicated().to_numpy()
+    within = repeated & (first_seen == reviews['workbook']).to_numpy()
+    cross = repeated & ~within
+    # 近似重复：所在组里有更靠前的评论，但内容与之前出现过的都不完全相同
+    near = (group != np.arange(len(reviews))) & ~repeated
+
+    keys_by_workbook = reviews.groupby('workbook', sort=False)['content_key'].agg(set)
+    workbooks = []
+    for filename, rows in reviews.groupby('workbook', sort=False):
+        idx = rows.index.to_numpy()
+        nlp_reviews = int(len(idx) - within[idx].sum() - cross[idx].sum())
+        workbooks.append({
+            'workbook': filename,
+            'main_category': rows['main_category'].iloc[0],
+            'sub_type': rows['sub_type'].iloc[0],
+            'reviews': int(len(idx)),
+            'within_duplicates': int(within[idx].sum()),
+            'cross_workbook_duplicates': int(cross[idx].sum()),
+            'nlp_reviews': nlp_reviews,
+            'duplication_rate': round(1 - nlp_reviews / len(idx), 6) if len(idx) else 0.0,
+            'near_duplicates': int(near[idx].sum()),
+            'shared_with': {
+                other: int(rows['content_key'].isin(keys).sum())
+                for other, keys in keys_by_workbook.items() if other != filename
+            },
+        })
+
+    examples = [
+        {'review': reviews.at[i, 'text'], 'workbook': reviews.at[i, 'workbook'],
+         'near_duplicate_of': reviews.at[group[i], 'text'], 'near_duplicate_workbook': reviews.at[group[i], 'workbook']}
+        for i in np.flatnonzero(near)[:args.examples]
+    ]
+    overall_nlp = int(len(reviews) - repeated.sum())
+    payload = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'threshold': args.threshold,
+        'minhash_seconds': round(minhash_seconds, 3),
+        'overall': {
+            'reviews': int(len(reviews)),
+            'nlp_reviews': overall_nlp,
+            'duplication_rate': round(1 - overall_nlp / len(reviews), 6) if len(reviews) else 0.0,
+            'near_duplicates': int(near.sum()),
+        },
+        'workbooks': workbooks,
+        'examples': examples,
+    }
+
+    o = payload['overall']
+    print(f"全部: 评论数={o['reviews']}  需 NLP={o['nlp_reviews']}  重复率={o['duplication_rate']:.2%}  "
+          f"近似重复={o['near_duplicates']}  (MinHash {minhash_seconds:.2f}s)")
+    for w in workbooks:
+        print(f"  {w['workbook']:<30} 评论数={w['reviews']:>6}  工作簿内重复={w['within_duplicates']:>5}  "
+              f"与前面工作簿重复={w['cross_workbook_duplicates']:>5}  重复率={w['duplication_rate']:.2%}  "
+              f"近似重复={w['near_duplicates']:>4}")
+
+    out = args.out or os.path.join(RESULTS_DIR, f"duplication_report_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已写入 {out}")
+
+
+if __name__ == "__main__":
+    main()
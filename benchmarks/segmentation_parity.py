@@ -0,0 +1,114 @@
+"""分句器一致性报告：在我们自己的工作簿上对比 fast 分句器与 punkt 参考实现。
+
+逐个 (main_category, sub_type) 报告两种分句结果完全相同的评论占比、句数与耗时；
+fast 分别在“不清洗 HTML”与“清洗 HTML”两种模式下各跑一遍，区分断句规则与 HTML 清洗各自带来的差异，
+并附上若干条不一致的评论样例便于人工检查。
+
+用法：
+    python benchmarks/segmentation_parity.py
+    python benchmarks/segmentation_parity.py --categories 儿童丙烯 --examples 20
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from review_analysis import DATA_MAP, iter_review_batches  # noqa: E402
+from segmentation import DEFAULT_SEGMENTER, segment_reviews  # noqa: E402
+from text_pipeline import init_nltk_resources  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+MODES = {'fast_raw': {'segmenter': 'fast', 'clean_html': False}, 'fast': {'segmenter': 'fast', 'clean_html': True}}
+
+
+def segment(texts, **kwargs):
+    """分句并按评论切回句子列表，返回 (每条评论的句子列表, 耗时)"""
+    start = time.perf_counter()
+    review_idx, _, sentences = segment_reviews(texts, **kwargs)
+    seconds = time.perf_counter() - start
+    grouped = pd.Series(sentences, dtype=object).groupby(review_idx).agg(list)
+    return grouped.reindex(range(len(texts))).map(lambda s: s if isinstance(s, list) else []).tolist(), seconds
+
+
+def parity(reference, candidate):
+    """评论层面的一致性指标"""
+    same = [r == c for r, c in zip(reference, candidate)]
+    return {
+        'reviews': len(reference),
+        'identical_rate': round(sum(same) / len(same), 6) if same else 1.0,
+        'reference_sentences': sum(len(r) for r in reference),
+        'candidate_sentences': sum(len(c) for c in candidate),
+    }
+
+
+def main(argv=None):
+    categories = list(dict.fromkeys(info[0] for info in DATA_MAP.values()))
+    parser = argparse.ArgumentParser(description="fast 分句器与 punkt 的一致性报告")
+    parser.add_argument('--data-dir', default=ROOT, help="工作簿所在目录")
+    parser.add_argument('--categories', nargs='+', choices=categories, default=categories, help="只对比指定类目")
+    parser.add_argument('--examples', type=int, default=10, help="每种模式记录的差异样例条数")
+    parser.add_argument('--out', default=None, help="结果 JSON 路径，默认写入 benchmarks/results/")
+    args = parser.parse_args(argv)
+
+    init_nltk_resources()
+    slices, examples = [], {mode: [] for mode in MODES}
+    totals = {mode: {'reference_seconds': 0.0, 'candidate_seconds': 0.0, 'pairs': ([], [])} for mode in MODES}
+    for filename, (main_category, sub_type) in DATA_MAP.items():
+        path = os.path.join(args.data_dir, filename)
+        if not os.path.exists(path) or main_category not in args.categories:
+            continue
+        texts = []
+        for batch, col_name in iter_review_batches(path):
+            texts.extend(batch[col_name].dropna().astype(str).tolist())
+
+        reference, reference_seconds = segment(texts, segmenter=DEFAULT_SEGMENTER)
+        entry = {'main_category': main_category, 'sub_type': sub_type, 'reference_seconds': round(reference_seconds, 3)}
+        for mode, kwargs in MODES.items():
+            candidate, candidate_seconds = segment(texts, **kwargs)
+            entry[mode] = {**parity(reference, candidate), 'candidate_seconds': round(candidate_seconds, 3)}
+            totals[mode]['reference_seconds'] += reference_seconds
+            totals[mode]['candidate_seconds'] += candidate_seconds
+            totals[mode]['pairs'][0].extend(reference)
+            totals[mode]['pairs'][1].extend(candidate)
+            for text, r, c in zip(texts, reference, candidate):
+                if r != c and len(examples[mode]) < args.examples:
+                    examples[mode].append({'review': text, DEFAULT_SEGMENTER: r, mode: c})
+        slices.append(entry)
+
+    overall = {
+        mode: {**parity(*t['pairs']), 'reference_seconds': round(t['reference_seconds'], 3),
+               'candidate_seconds': round(t['candidate_seconds'], 3)}
+        for mode, t in totals.items()
+    }
+    payload = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'reference': DEFAULT_SEGMENTER,
+        'overall': overall,
+        'slices': slices,
+        'examples': examples,
+    }
+
+    for mode, o in overall.items():
+        print(f"[{mode}] {DEFAULT_SEGMENTER}: {o['reference_seconds']:.2f}s   {mode}: {o['candidate_seconds']:.2f}s   "
+              f"(x{o['reference_seconds'] / max(o['candidate_seconds'], 1e-9):.1f})")
+        for s in [{'main_category': '全部', 'sub_type': '', mode: o}] + slices:
+            m = s[mode]
+            print(f"  {s['main_category']} {s['sub_type']:<10} 评论数={m['reviews']:>6}  分句一致率={m['identical_rate']:.4%}  "
+                  f"句数 {m['reference_sentences']} -> {m['candidate_sentences']}")
+
+    out = args.out or os.path.join(RESULTS_DIR, f"segmentation_parity_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已写入 {out}")
+
+
+if __name__ == "__main__":
+    main()
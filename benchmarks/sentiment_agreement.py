@@ -0,0 +1,123 @@
+"""情感打分后端一致性报告：在我们自己的工作簿上对比候选后端与 TextBlob 参考实现。
+
+逐个 (main_category, sub_type) 报告 s_pol 的差异，以及 analyze_sentiments 里
+亮点/痛点判定阈值（s_pol > -0.1 / s_pol < 0.1）被翻转的句子数，
+最后用两份 s_pol 分别跑一遍 analyze_sentiments，列出各维度亮点/痛点计数的变化。
+
+用法：
+    python benchmarks/sentiment_agreement.py
+    python benchmarks/sentiment_agreement.py --backend lexicon --categories 儿童丙烯
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dictionaries import FEATURE_DIC  # noqa: E402
+from keyword_matcher import KeywordMatcher  # noqa: E402
+from review_analysis import DATA_MAP, analyze_sentiments, load_sentences  # noqa: E402
+from sentiment_backends import DEFAULT_BACKEND, SENTIMENT_BACKENDS, get_sentiment_backend  # noqa: E402
+from text_pipeline import init_nltk_resources  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+# 两份 s_pol 的差异在此范围内视为一致（向量化求和顺序不同带来的浮点误差）
+TOLERANCE = 1e-9
+
+
+def score(backend_name, texts):
+    start = time.perf_counter()
+    polarities = get_sentiment_backend(backend_name).polarities(texts)
+    return polarities, time.perf_counter() - start
+
+
+def agreement(reference, candidate):
+    """s_pol 层面的一致性指标"""
+    diff = np.abs(candidate - reference)
+    return {
+        'sentences': int(len(reference)),
+        'exact_rate': round(float(np.mean(diff <= TOLERANCE)), 6) if len(diff) else 1.0,
+        'mean_abs_diff': float(diff.mean()) if len(diff) else 0.0,
+        'max_abs_diff': float(diff.max()) if len(diff) else 0.0,
+        'sign_agreement': round(float(np.mean(np.sign(reference) == np.sign(candidate))), 6) if len(diff) else 1.0,
+        # analyze_sentiments 的判定阈值：痛点看 s_pol < 0.1，亮点看 s_pol > -0.1
+        'neg_threshold_flips': int(np.sum((reference < 0.1) != (candidate < 0.1))),
+        'pos_threshold_flips': int(np.sum((reference > -0.1) != (candidate > -0.1))),
+    }
+
+
+def count_shift(df_sub, candidate_pol, tag_hits):
+    """分别用参考与候选 s_pol 跑 analyze_sentiments，返回各维度亮点/痛点计数的变化"""
+    reference = analyze_sentiments(df_sub, tag_hits).set_index('维度')
+    candidate = analyze_sentiments(df_sub.assign(s_pol=candidate_pol), tag_hits).set_index('维度')
+    shift = (candidate[['亮点', '痛点']] - reference[['亮点', '痛点']])
+    changed = shift[(shift != 0).any(axis=1)]
+    return {
+        'highlight_shift': int(shift['亮点'].abs().sum()),
+        'painpoint_shift': int(shift['痛点'].abs().sum()),
+        'dimensions_changed': {dim: {'亮点': int(r['亮点']), '痛点': int(r['痛点'])} for dim, r in changed.iterrows()},
+    }
+
+
+def main(argv=None):
+    categories = list(dict.fromkeys(info[0] for info in DATA_MAP.values()))
+    candidates = [name for name in SENTIMENT_BACKENDS if name != DEFAULT_BACKEND]
+    parser = argparse.ArgumentParser(description="情感打分后端与 TextBlob 的一致性报告")
+    parser.add_argument('--data-dir', default=ROOT, help="工作簿所在目录")
+    parser.add_argument('--backend', choices=candidates, default=candidates[0], help="候选后端")
+    parser.add_argument('--categories', nargs='+', choices=categories, default=categories, help="只对比指定类目")
+    parser.add_argument('--out', default=None, help="结果 JSON 路径，默认写入 benchmarks/results/")
+    args = parser.parse_args(argv)
+
+    init_nltk_resources()
+    # 分句结果与后端无关；两个后端都对同一批句子重新打分，不依赖句子缓存里存的是哪份 s_pol
+    df = load_sentences(args.data_dir, categories=args.categories)
+    texts = df['s_text'].tolist()
+    reference, reference_seconds = score(DEFAULT_BACKEND, texts)
+    candidate, candidate_seconds = score(args.backend, texts)
+    df = df.assign(s_pol=reference)
+    tag_hits = KeywordMatcher(FEATURE_DIC).hit_matrix(df['s_text'])
+
+    slices = []
+    for (main_category, sub_type), df_sub in df.groupby(['main_category', 'sub_type'], sort=False, observed=True):
+        rows = df_sub.index.to_numpy()
+        slices.append({
+            'main_category': main_category, 'sub_type': sub_type,
+            **agreement(reference[rows], candidate[rows]),
+            **count_shift(df_sub, candidate[rows], tag_hits),
+        })
+
+    payload = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'reference': DEFAULT_BACKEND,
+        'candidate': args.backend,
+        'reference_seconds': round(reference_seconds, 3),
+        'candidate_seconds': round(candidate_seconds, 3),
+        'overall': agreement(reference, candidate),
+        'slices': slices,
+    }
+
+    print(f"{DEFAULT_BACKEND}: {reference_seconds:.2f}s   {args.backend}: {candidate_seconds:.2f}s   "
+          f"(x{reference_seconds / max(candidate_seconds, 1e-9):.1f})")
+    for s in [{'main_category': '全部', 'sub_type': '', **payload['overall']}] + slices:
+        line = (f"{s['main_category']} {s['sub_type']:<10} 句数={s['sentences']:>6}  一致率={s['exact_rate']:.4%}  "
+                f"MAE={s['mean_abs_diff']:.2e}  阈值翻转(痛点/亮点)={s['neg_threshold_flips']}/{s['pos_threshold_flips']}")
+        if 'painpoint_shift' in s:
+            line += f"  计数变化(亮点/痛点)={s['highlight_shift']}/{s['painpoint_shift']}"
+        print(line)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"sentiment_agreement_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已写入 {out}")
+
+
+if __name__ == "__main__":
+    main()
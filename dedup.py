@@ -0,0 +1,92 @@
+"""评论去重：按内容哈希精确去重，用 MinHash 找近似重复。
+
+分句与情感打分的输入就是小写后的正文，content_keys 对它取哈希：键相同的评论，NLP 结果必然相同。
+摄取时每个键只处理一次，结果按键分发给所有包含它的工作簿 / 子类（见 review_analysis.split_reviews）。
+近似重复（只差标点、空格或个别词）的评论分句结果并不相同，不能直接复用，只在重复率报告里统计
+（benchmarks/duplication_report.py）。
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# MinHash 参数：64 个哈希函数分成 16 个 band（每 band 4 行），估计 Jaccard 约 0.5 以上的评论对会成为候选
+NUM_PERM = 64
+BANDS = 16
+SHINGLE_SIZE = 3
+NEAR_DUPLICATE_THRESHOLD = 0.8
+# 小于 2^32 的最大素数：哈希值与系数都小于它，乘积不会溢出 uint64
+_PRIME = np.uint64((1 << 32) - 5)
+_WORD = re.compile(r"[^\W_]+")
+
+
+def normalize_content(texts):
+    """NLP 实际看到的正文：与 segment_reviews 一样逐条 str() 后转小写"""
+    return pd.Series([str(t).lower() for t in texts], dtype=object)
+
+
+def content_keys(texts):
+    """每条评论的内容键（uint64），相同即 NLP 结果相同"""
+    return pd.util.hash_pandas_object(normalize_content(texts), index=False).to_numpy()
+
+
+def _shingles(text):
+    words = _WORD.findall(text)
+    if len(words) <= SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signatures(texts, num_perm=NUM_PERM, seed=1):
+    """词级 3-gram 的 MinHash 签名，形状 (len(texts), num_perm)；没有词的评论整行为最大值"""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, int(_PRIME), num_perm, dtype=np.uint64)
+    b = rng.integers(0, int(_PRIME), num_perm, dtype=np.uint64)
+    signatures = np.full((len(texts), num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+
+    # 全部评论的 shingle 拉平后一次性哈希，再按评论分段取最小值
+    shingles = [sorted(_shingles(text)) for text in normalize_content(texts)]
+    counts = np.array([len(s) for s in shingles], dtype=np.int64)
+    if not counts.sum():
+        return signatures
+    hashed = pd.util.hash_array(np.array([s for group in shingles for s in group], dtype=object)) % _PRIME
+    has_words = counts > 0
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[has_words]
+    for lo in range(0, num_perm, 8):  # 分块计算，控制中间矩阵大小
+        values = (np.outer(hashed, a[lo:lo + 8]) + b[lo:lo + 8]) % _PRIME
+        signatures[has_words, lo:lo + 8] = np.minimum.reduceat(values, starts, axis=0)
+    return signatures
+
+
+def near_duplicate_groups(texts, threshold=NEAR_DUPLICATE_THRESHOLD, num_perm=NUM_PERM, bands=BANDS):
+    """近似重复分组：返回每条评论所在组的代表（组内最靠前的评论位置），不重复的评论代表是它自己。
+
+    LSH 分桶找候选，再用签名估计的 Jaccard 与桶内最靠前的评论比较，达到 threshold 的并入同一组。
+    精确重复（内容键相同）的评论也会落在同一组。
+    """
+    signatures = minhash_signatures(texts, num_perm)
+    parent = np.arange(len(signatures))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    candidates = np.flatnonzero(signatures[:, 0] != np.iinfo(np.uint64).max)
+    rows = num_perm // bands
+    for band in range(bands):
+        bucket = pd.util.hash_pandas_object(
+            pd.DataFrame(signatures[candidates, band * rows:(band + 1) * rows]), index=False).to_numpy()
+        # 同一桶的评论排到一起（稳定排序，桶内保持原顺序），每条与桶内第一条比较
+        order = np.argsort(bucket, kind='stable')
+        members, bucket = candidates[order], bucket[order]
+        first = np.concatenate([[True], bucket[1:] != bucket[:-1]])
+        representative = members[np.flatnonzero(first)[np.cumsum(first) - 1]]
+        similarity = (signatures[members] == signatures[representative]).mean(axis=1)
+        for rep, other in zip(representative[~first & (similarity >= threshold)],
+                              members[~first & (similarity >= threshold)]):
+            root_a, root_b = find(rep), find(other)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+    return np.array([find(i) for i in range(len(parent))], dtype=np.int64)
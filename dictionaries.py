@@ -0,0 +1,77 @@
+"""词库配置：维度关键词、ASIN → SKU 规格映射、用户画像规则。
+
+词库内容存放在 data/dictionaries/*.json，改词直接编辑 JSON 即可。本模块按需加载：首次访问
+FEATURE_DIC / CLASSIFICATION_RULES / USER_CATEGORY_MAPPING 时读取并校验对应文件，结果按文件修改时间缓存，
+同一进程内的所有 rerun 与会话共用一份；文件被修改后，下一次访问自动重新加载。
+"""
+import json
+import os
+from functools import lru_cache
+
+DICTIONARY_DIR = os.environ.get(
+    "DICTIONARY_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "dictionaries")
+)
+
+# 模块属性名 -> (文件名, 结构)
+DICTIONARY_FILES = {
+    # --- 1. 核心词库配置 (Feature Keywords) ---
+    'FEATURE_DIC': ('feature_dic.json', 'keywords'),
+    # --- 2. 产品分类映射 (Product & Category Mapping) ---
+    'USER_CATEGORY_MAPPING': ('user_category_mapping.json', 'mapping'),
+    # --- 3. 消费者用户画像 ---
+    'CLASSIFICATION_RULES': ('classification_rules.json', 'keywords'),
+}
+
+
+def _no_duplicate_keys(pairs):
+    """JSON 里重复的维度 / 标签会被静默覆盖，这里直接报错"""
+    keys = [k for k, _ in pairs]
+    duplicated = sorted({k for k in keys if keys.count(k) > 1})
+    if duplicated:
+        raise ValueError(f"重复的键：{', '.join(duplicated)}")
+    return dict(pairs)
+
+
+def _validate_keywords(data, path):
+    """{维度: {标签: [关键词, ...]}}"""
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: 顶层应为 {{维度: {{标签: [关键词]}}}}")
+    for dimension, sub_dict in data.items():
+        if not isinstance(sub_dict, dict) or not sub_dict:
+            raise ValueError(f"{path}: 维度 {dimension!r} 应为非空的 {{标签: [关键词]}}")
+        for tag, keywords in sub_dict.items():
+            if not isinstance(keywords, list) or not all(isinstance(k, str) for k in keywords):
+                raise ValueError(f"{path}: {dimension!r} / {tag!r} 的关键词应为字符串列表")
+
+
+def _validate_mapping(data, path):
+    """{ASIN: SKU 规格}"""
+    if not isinstance(data, dict) or not all(isinstance(k, str) and isinstance(v, str) for k, v in data.items()):
+        raise ValueError(f"{path}: 应为 {{ASIN: SKU 规格}} 的字符串映射")
+
+
+_VALIDATORS = {'keywords': _validate_keywords, 'mapping': _validate_mapping}
+
+
+@lru_cache(maxsize=16)
+def _load(path, mtime_ns, kind):
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f, object_pairs_hook=_no_duplicate_keys)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from e
+    _VALIDATORS[kind](data, path)
+    return data
+
+
+def load_dictionary(name):
+    """读取并校验某个词库（name 为 DICTIONARY_FILES 中的属性名）；文件未变化时直接返回已加载的对象"""
+    filename, kind = DICTIONARY_FILES[name]
+    path = os.path.join(DICTIONARY_DIR, filename)
+    return _load(path, os.stat(path).st_mtime_ns, kind)
+
+
+def __getattr__(name):
+    if name in DICTIONARY_FILES:
+        return load_dictionary(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
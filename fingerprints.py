@@ -0,0 +1,26 @@
+"""内容指纹：词库（及词库内各维度）与语料的稳定哈希，用作各级缓存的失效键。
+
+下游缓存只以自己依赖的指纹为键，例如命中矩阵按 FEATURE_DIC 的维度指纹缓存，
+给某个维度加关键词只会让该维度的命中失效，句子库与情感分数不依赖任何词库。
+"""
+import hashlib
+import json
+
+import pandas as pd
+
+
+def fingerprint(obj):
+    """可 JSON 序列化对象的指纹；保留键顺序（画像标签取词库中第一个命中的标签，顺序也是语义的一部分）"""
+    payload = json.dumps(obj, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def dimension_fingerprints(dictionary):
+    """{维度: 指纹}；维度名本身也计入指纹"""
+    return {dimension: fingerprint([dimension, sub_dict]) for dimension, sub_dict in dictionary.items()}
+
+
+def corpus_fingerprint(texts):
+    """语料指纹：对句子序列做向量化哈希，无需先拼接成大字符串"""
+    hashes = pd.util.hash_pandas_object(pd.Series(texts, dtype=object).astype(str), index=False).to_numpy()
+    return hashlib.sha256(hashes.tobytes()).hexdigest()
@@ -0,0 +1,201 @@
+"""基于 Aho-Corasick 自动机的词库匹配。
+
+把 {维度: {标签: [关键词]}} 一次性编译成自动机，每个句子只扫描一遍即可拿到全部 (维度, 标签) 命中，
+匹配耗时只随语料规模增长，与标签数量无关。
+"""
+from collections import OrderedDict
+from threading import Lock
+
+import ahocorasick
+import numpy as np
+
+from fingerprints import fingerprint
+
+# 进程内复用的已编译自动机个数（全量词库 + 增量重扫时的维度子集）
+COMPILED_CACHE_SIZE = 32
+
+_compiled = OrderedDict()
+_lock = Lock()
+
+
+class TagHitMatrix:
+    """句子 × 标签 的稀疏布尔命中矩阵，按标签压缩存储（CSC）。
+
+    同一次扫描记录两种匹配语义：
+    - exact: 区分大小写，等价于 analyze_sentiments 原来的 `str.contains(pattern)`；
+    - loose: 忽略大小写并跳过空白关键词，等价于下钻与气泡图里的 `flags=re.IGNORECASE` 匹配。
+    """
+
+    def __init__(self, tags, n_rows, rows, tag_ids, exact, loose):
+        self.tags = list(tags)
+        self.tag_ids = {t: i for i, t in enumerate(self.tags)}
+        self.n_rows = n_rows
+
+        order = np.lexsort((rows, tag_ids))
+        self.indices = np.asarray(rows, dtype=np.int64)[order]
+        self.exact = np.asarray(exact, dtype=bool)[order]
+        self.loose = np.asarray(loose, dtype=bool)[order]
+        counts = np.bincount(np.asarray(tag_ids, dtype=np.int64), minlength=len(self.tags))
+        self.indptr = np.concatenate([[0], np.cumsum(counts)])
+
+    @classmethod
+    def from_csc(cls, tags, n_rows, indices, indptr, exact, loose):
+        """直接由压缩存储的数组构建（用于按维度缓存后的还原）"""
+        matrix = cls.__new__(cls)
+        matrix.tags = list(tags)
+        matrix.tag_ids = {t: i for i, t in enumerate(matrix.tags)}
+        matrix.n_rows = n_rows
+        matrix.indices = np.asarray(indices, dtype=np.int64)
+        matrix.exact = np.asarray(exact, dtype=bool)
+        matrix.loose = np.asarray(loose, dtype=bool)
+        matrix.indptr = np.asarray(indptr, dtype=np.int64)
+        return matrix
+
+    @classmethod
+    def concat(cls, parts, n_rows):
+        """按标签方向拼接多个同行数的矩阵，标签顺序为 parts 的先后顺序"""
+        indptr = [np.zeros(1, dtype=np.int64)]
+        offset = 0
+        for part in parts:
+            indptr.append(part.indptr[1:] + offset)
+            offset += part.indptr[-1]
+        return cls.from_csc(
+            [t for part in parts for t in part.tags], n_rows,
+            np.concatenate([np.zeros(0, dtype=np.int64)] + [part.indices for part in parts]),
+            np.concatenate(indptr),
+            np.concatenate([np.zeros(0, dtype=bool)] + [part.exact for part in parts]),
+            np.concatenate([np.zeros(0, dtype=bool)] + [part.loose for part in parts]),
+        )
+
+    def dimension_part(self, dimension):
+        """某个维度的子矩阵（同一维度的标签 id 连续）"""
+        ids = self.dimension_tag_ids(dimension)
+        first, last = (ids[0], ids[-1] + 1) if ids else (0, 0)
+        start, end = self.indptr[first], self.indptr[last]
+        return TagHitMatrix.from_csc(
+            [self.tags[i] for i in ids], self.n_rows, self.indices[start:end],
+            self.indptr[first:last + 1] - start, self.exact[start:end], self.loose[start:end],
+        )
+
+    def tag_rows(self, tag_id, exact=False):
+        """命中某个标签的句子行号（升序）"""
+        start, end = self.indptr[tag_id], self.indptr[tag_id + 1]
+        flags = (self.exact if exact else self.loose)[start:end]
+        return self.indices[start:end][flags]
+
+    def dimension_tag_ids(self, dimension):
+        return [i for i, (dim, _) in enumerate(self.tags) if dim == dimension]
+
+    def mask(self, tag_ids, exact=False):
+        """命中任一标签的布尔掩码，长度为 n_rows"""
+        hit = np.zeros(self.n_rows, dtype=bool)
+        for tag_id in tag_ids:
+            hit[self.tag_rows(tag_id, exact)] = True
+        return hit
+
+
+class KeywordMatcher:
+    """词库自动机。语义与 `str.contains('|'.join(re.escape(k) ...))` 逐标签匹配一致"""
+
+    def __init__(self, dictionary):
+        self.tags = []      # tag_id -> (维度, 标签)
+        self.tag_ids = {}   # (维度, 标签) -> tag_id
+        # 空白关键词：区分大小写的正则会照常匹配（空串匹配任何句子），忽略大小写的视图会把它们过滤掉
+        self._blank = []
+
+        payloads = {}
+        for dimension, sub_dict in dictionary.items():
+            for tag, keywords in sub_dict.items():
+                tag_id = len(self.tags)
+                self.tags.append((dimension, tag))
+                self.tag_ids[(dimension, tag)] = tag_id
+                for k in keywords:
+                    k = str(k)
+                    if not k.strip():
+                        self._blank.append((tag_id, k))
+                        continue
+                    # 自动机统一按小写建立，原词是否全小写决定它能否参与区分大小写的匹配
+                    payloads.setdefault(k.lower(), []).append((tag_id, k, k == k.lower()))
+
+        self._automaton = ahocorasick.Automaton()
+        for key, payload in payloads.items():
+            self._automaton.add_word(key, tuple(payload))
+        if payloads:
+            self._automaton.make_automaton()
+
+    def _hits(self, text):
+        """单句命中：返回 (区分大小写命中, 忽略大小写命中) 两个 tag_id 集合"""
+        exact, loose = set(), set()
+        lowered = text.lower()
+        already_lower = lowered == text
+        if len(self._automaton):
+            for _, payload in self._automaton.iter(lowered):
+                for tag_id, keyword, is_lower in payload:
+                    loose.add(tag_id)
+                    if tag_id not in exact and (is_lower if already_lower else keyword in text):
+                        exact.add(tag_id)
+        for tag_id, keyword in self._blank:
+            if keyword in text:
+                exact.add(tag_id)
+        return exact, loose
+
+    def first_tags(self, texts, default="未提及"):
+        """每个维度取每句第一个命中的标签（按词库中标签的先后顺序），返回 {维度: 标签数组}。
+
+        语义与 `any(str(k).lower() in str(text).lower() for k in keywords)` 逐标签判断一致。
+        """
+        rows, ids = [], []
+        n_rows = 0
+        for row, text in enumerate(texts):
+            n_rows = row + 1
+            text = str(text).lower()
+            _, hit = self._hits(text)
+            hit.update(tag_id for tag_id, keyword in self._blank if keyword.lower() in text)
+            rows.extend([row] * len(hit))
+            ids.extend(hit)
+        rows = np.asarray(rows, dtype=np.int64)
+        ids = np.asarray(ids, dtype=np.int64)
+
+        # tag_id 按词库顺序递增，同一维度内取最小 tag_id 即“第一个命中的标签”
+        tag_dims = np.array([dim for dim, _ in self.tags], dtype=object)
+        tag_names = np.array([tag for _, tag in self.tags] + [default], dtype=object)
+        no_hit = len(self.tags)
+        result = {}
+        for dimension in dict.fromkeys(dim for dim, _ in self.tags):
+            in_dim = tag_dims[ids] == dimension if len(ids) else np.zeros(0, dtype=bool)
+            first = np.full(n_rows, no_hit, dtype=np.int64)
+            np.minimum.at(first, rows[in_dim], ids[in_dim])
+            result[dimension] = tag_names[first]
+        return result
+
+    def hit_matrix(self, texts):
+        """扫描一遍，同时得到两种匹配语义下的 TagHitMatrix"""
+        rows, ids, exact_flags, loose_flags = [], [], [], []
+        n_rows = 0
+        for row, text in enumerate(texts):
+            n_rows = row + 1
+            if not isinstance(text, str):
+                continue
+            exact, loose = self._hits(text)
+            for tag_id in exact | loose:
+                rows.append(row)
+                ids.append(tag_id)
+                exact_flags.append(tag_id in exact)
+                loose_flags.append(tag_id in loose)
+        return TagHitMatrix(self.tags, n_rows, rows, ids, exact_flags, loose_flags)
+
+
+def compiled_matcher(dictionary):
+    """按词库指纹复用已编译的自动机：同一进程内的 rerun 与会话共用，词库不变时不再重建"""
+    key = fingerprint(dictionary)
+    with _lock:
+        if key in _compiled:
+            _compiled.move_to_end(key)
+            return _compiled[key]
+    matcher = KeywordMatcher(dictionary)
+    with _lock:
+        _compiled[key] = matcher
+        _compiled.move_to_end(key)
+        while len(_compiled) > COMPILED_CACHE_SIZE:
+            _compiled.popitem(last=False)
+    return matcher
@@ -0,0 +1,87 @@
+"""热路径埋点：记录每次 rerun 中各阶段的耗时、行数与内存变化。
+
+看板每次 rerun 调用 start_trace() 开启一份 trace，页面结束时 stop_trace()；分析代码里用 trace_stage() 包住各阶段即可，
+没有开启 trace 时（例如批量报表、基准测试）trace_stage() 不做任何记录。
+"""
+import contextvars
+import json
+import os
+import time
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar("perf_trace", default=None)
+
+
+def _rss_mb():
+    """当前进程常驻内存（MB）；非 Linux 环境拿不到时返回 None"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class PerfTrace:
+    """一次 rerun 的阶段记录，阶段可以嵌套（depth 表示层级）"""
+
+    def __init__(self, label=""):
+        self.label = label
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self._depth = 0
+        self.records = []
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        record = {'stage': name, 'depth': self._depth, 'rows': rows,
+                  'start': round(time.perf_counter() - self._t0, 4)}
+        self._depth += 1
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            self._depth -= 1
+            rss_after = _rss_mb()
+            record['seconds'] = round(time.perf_counter() - start, 4)
+            record['rss_mb'] = round(rss_after, 1) if rss_after is not None else None
+            record['rss_delta_mb'] = round(rss_after - rss_before, 1) if rss_after is not None else None
+            self.records.append(record)
+
+    def to_dict(self):
+        return {
+            'label': self.label,
+            'started_at': self.started_at,
+            'total_seconds': round(time.perf_counter() - self._t0, 4),
+            'stages': sorted(self.records, key=lambda r: r['start']),
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+
+def start_trace(label=""):
+    """为当前 rerun 开启新的 trace"""
+    trace = PerfTrace(label)
+    _current.set(trace)
+    return trace
+
+
+def stop_trace():
+    """结束当前 trace，之后的 trace_stage() 不再记录到它"""
+    _current.set(None)
+
+
+def current_trace():
+    return _current.get()
+
+
+@contextmanager
+def trace_stage(name, rows=None):
+    """记录一个阶段；yield 出的 dict 可在阶段内补充 rows 等字段"""
+    trace = _current.get()
+    if trace is None:
+        yield {}
+        return
+    with trace.stage(name, rows) as record:
+        yield record
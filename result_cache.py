@@ -0,0 +1,199 @@
+"""跨会话共享的分析结果缓存：进程内 LRU（按条数与字节数限额）+ 可选的磁盘层（多进程共享）。
+
+同一进程里的所有会话共用一份结果：第一个会话计算时，其它请求同一键的会话等待并直接复用，
+不会各自重复计算；设置 RESULT_CACHE_DIR 后结果同时落盘，多个看板进程之间也能共享。
+磁盘层同样有字节数上限（RESULT_CACHE_DISK_MB），按文件修改时间淘汰最久未用的条目，读取命中时刷新修改时间。
+返回的对象在会话间共享，调用方不要原地修改。
+"""
+import hashlib
+import json
+import os
+import pickle
+import sys
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+import pandas as pd
+
+# 磁盘层默认关闭；设置目录后启用（多个 Streamlit 进程指向同一目录即可共享）
+RESULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR")
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_MB", 256)) * 2**20
+# 磁盘层每个缓存的字节数上限
+DEFAULT_MAX_DISK_BYTES = int(os.environ.get("RESULT_CACHE_DISK_MB", 1024)) * 2**20
+
+_registry = {}
+_registry_lock = Lock()
+
+
+def _digest(key):
+    payload = json.dumps(key, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def estimate_bytes(value, _seen=None):
+    """结果对象的内存估算（不序列化）：DataFrame / Series / 数组按实际占用，容器与普通对象逐个成员累加"""
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_bytes(k, seen) + estimate_bytes(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_bytes(v, seen) for v in value)
+    if hasattr(value, '__dict__') and not isinstance(value, type):
+        return sys.getsizeof(value) + estimate_bytes(vars(value), seen)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """一个命名的结果缓存，通过 get_or_compute(key, compute) 使用"""
+
+    def __init__(self, name, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, disk_dir=RESULT_CACHE_DIR,
+                 max_disk_bytes=DEFAULT_MAX_DISK_BYTES):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_dir = os.path.join(disk_dir, name) if disk_dir else None
+        self._entries = OrderedDict()  # digest -> (value, 字节数)
+        self._bytes = 0
+        self._lock = Lock()
+        self._key_locks = {}
+        self.hits = self.misses = self.disk_hits = self.evictions = self.disk_evictions = 0
+
+    def _memory_get(self, digest):
+        with self._lock:
+            if digest in self._entries:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return True, self._entries[digest][0]
+        return False, None
+
+    def _memory_put(self, digest, value, size):
+        with self._lock:
+            if digest in self._entries:
+                self._bytes -= self._entries.pop(digest)[1]
+            self._entries[digest] = (value, size)
+            self._bytes += size
+            # 超过条数或字节数上限时淘汰最久未使用的条目（至少保留刚写入的这一条）
+            while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def _disk_path(self, digest):
+        return os.path.join(self.disk_dir, f"{digest}.pkl")
+
+    def _disk_get(self, digest):
+        if not self.disk_dir or not os.path.exists(self._disk_path(digest)):
+            return None
+        try:
+            with open(self._disk_path(digest), 'rb') as f:
+                payload = f.read()
+            os.utime(self._disk_path(digest))  # 刷新修改时间，淘汰时视为最近使用
+            return payload
+        except OSError:
+            return None
+
+    def _disk_put(self, digest, payload):
+        os.makedirs(self.disk_dir, exist_ok=True)
+        path = self._disk_path(digest)
+        # 临时文件名带上进程号，多个进程同时写同一条结果时互不干扰
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp, path)
+        self._disk_prune(keep=path)
+
+    def _disk_prune(self, keep):
+        """磁盘层超过字节数上限时按修改时间删除最久未用的条目（刚写入的这条保留）；其它进程同时删除时忽略即可"""
+        files = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(".pkl"):
+                try:
+                    stat = os.stat(os.path.join(self.disk_dir, name))
+                except OSError:
+                    continue
+                files.append((stat.st_mtime_ns, stat.st_size, os.path.join(self.disk_dir, name)))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self.disk_evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """key 为可 JSON 序列化的元组 / 列表；未命中时调用 compute() 计算并写入缓存"""
+        digest = _digest([self.name, key])
+        found, value = self._memory_get(digest)
+        if found:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(digest, Lock())
+        with key_lock:
+            # 等锁期间可能已被其它会话算好
+            found, value = self._memory_get(digest)
+            if found:
+                return value
+            payload = self._disk_get(digest)
+            if payload is not None:
+                try:
+                    value = pickle.loads(payload)
+                    with self._lock:
+                        self.disk_hits += 1
+                except (pickle.UnpicklingError, EOFError, ValueError):
+                    payload = None  # 磁盘缓存损坏时重新计算
+            if payload is None:
+                with self._lock:
+                    self.misses += 1
+                value = compute()
+                # 只有启用磁盘层时才序列化；内存层的字节数直接估算，不为计量多做一次 pickle
+                if self.disk_dir:
+                    self._disk_put(digest, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+            self._memory_put(digest, value, estimate_bytes(value))
+        with self._lock:
+            self._key_locks.pop(digest, None)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'cache': self.name, 'entries': len(self._entries), 'mb': round(self._bytes / 2**20, 2),
+                'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses, 'evictions': self.evictions,
+                'disk_evictions': self.disk_evictions,
+            }
+
+
+def get_cache(name, **kwargs):
+    """按名称取进程内唯一的缓存实例（Streamlit 每次 rerun 重新执行脚本，实例必须放在模块里才能跨 rerun 保留）"""
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = ResultCache(name, **kwargs)
+        return _registry[name]
+
+
+def cache_stats():
+    """全部缓存的命中统计，供性能面板展示"""
+    with _registry_lock:
+        caches = list(_registry.values())
+    return [cache.stats() for cache in caches]
@@ -0,0 +1,889 @@
+"""评论数据加载与分析引擎（不依赖 Streamlit）。
+
+看板 app.py 与批量报表 batch_report.py 共用这里的全部计算逻辑，保证两边口径一致。
+"""
+import hashlib
+import json
+import os
+from threading import Lock
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from dedup import content_keys
+from dictionaries import CLASSIFICATION_RULES, FEATURE_DIC, USER_CATEGORY_MAPPING
+from fingerprints import corpus_fingerprint, dimension_fingerprints, fingerprint
+from keyword_matcher import TagHitMatrix, compiled_matcher
+from perf_trace import trace_stage
+from segmentation import DEFAULT_SEGMENTER
+from sentiment_backends import DEFAULT_BACKEND
+from shared_store import open_shared, read_arrays, read_frame, write_arrays, write_frame
+from text_pipeline import analyze_reviews, review_pool
+
+# --- 1. 数据源配置 ---
+DATA_MAP = {
+    "kids_sales.xlsx": ("儿童丙烯", "🔥 高销量"),
+    "kids_trending.xlsx": ("儿童丙烯", "📈 高增长趋势"),
+    "large_capacity_sales.xlsx": ("大容量丙烯", "🔥 高销量"),
+    "large_capacity_trending.xlsx": ("大容量丙烯", "📈 高增长趋势")
+}
+
+# 句子级缓存：按源文件落盘为 Parquet，冷启动直接读取，无需重新分句与情感打分
+SENTENCE_CACHE_DIR = os.environ.get("SENTENCE_CACHE_DIR", ".sentence_cache")
+SENTENCE_CACHE_VERSION = 5
+SENTENCE_COLUMNS = ['review_key', 'content_key', 's_text', 's_pol', 'asin', 'main_category', 'sub_type', 'Rating', 'Helpful', 'Date']
+# 内存中句子明细表的紧凑列类型
+LABEL_COLUMNS = ['asin', 'main_category', 'sub_type', 'sku_spec']
+TEXT_DTYPE = pd.StringDtype("pyarrow", na_value=np.nan)
+# 工作簿只读取分析需要的列；标题、图片/头像/主页 URL 等长字符串列在读取时直接跳过
+CONTENT_COLUMNS = ['Content', 'Review Body', 'Body', 'content']
+ASIN_COLUMNS = ['ASIN', 'Parent ASIN', 'Product ID', 'Asin', 'child_asin']
+REVIEW_FIELDS = ['Rating', 'Helpful', 'Reviews URL', 'Author', 'Date']
+NUMERIC_FIELDS = ['Rating', 'Helpful']
+# 读作缺失值的单元格文本，与 pd.read_excel 的默认 na_values 相同（正文为 "N/A" 等的评论不参与分析）
+NA_STRINGS = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN', '<NA>',
+              'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+# 流式读取时每批的评论条数，峰值内存由批大小决定而不是工作簿大小
+REVIEW_BATCH_SIZE = int(os.environ.get("REVIEW_BATCH_SIZE", 5000))
+# 分句与情感打分的并行进程数，默认使用全部 CPU；设为 1 即退回串行路径
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", os.cpu_count() or 1))
+# 情感打分后端（见 sentiment_backends）：textblob 为参考实现，lexicon 为批量向量化实现
+SENTIMENT_BACKEND = os.environ.get("SENTIMENT_BACKEND", DEFAULT_BACKEND)
+# 命中矩阵 / 画像列按词库维度缓存：修改某个维度只重算该维度（见 fingerprints）
+DIMENSION_CACHE_DIR = os.environ.get("DIMENSION_CACHE_DIR", ".dimension_cache")
+# 分句器（见 segmentation）：punkt 为参考实现，fast 为整批正则分句
+SEGMENTER = os.environ.get("SEGMENTER", DEFAULT_SEGMENTER)
+
+
+# --- 2. 数据加载 ---
+def file_fingerprint(filename):
+    """源文件指纹：路径、大小、修改时间与内容哈希，任一变化即视为需要重建"""
+    stat = os.stat(filename)
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return {
+        'path': os.path.abspath(filename),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'sha256': digest.hexdigest(),
+    }
+
+
+def _convert_cell(cell):
+    """与 pd.read_excel(engine='openpyxl') 的单元格转换一致：空单元格为 ""，整数值的浮点转为 int"""
+    if cell.value is None:
+        return ""
+    if cell.data_type == 'e':
+        return np.nan
+    if cell.data_type == 'n' and cell.value == int(cell.value):
+        return int(cell.value)
+    return cell.value
+
+
+def iter_review_batches(filename, batch_size=REVIEW_BATCH_SIZE):
+    """流式读取工作簿（openpyxl 只读模式），按批产出 (评论表, 正文列名)。
+
+    只投影正文、ASIN 与 REVIEW_FIELDS 这几列；缺失值文本与 pd.read_excel 相同（见 NA_STRINGS），星级与有用票数转为数值。
+    评论表已带规范化后的 asin 列。
+    """
+    name = os.path.basename(filename)
+    wb = load_workbook(filename, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        ws.reset_dimensions()
+        rows = ws.iter_rows()
+        header = [str(c.value) if c.value is not None else "" for c in next(rows, ())]
+
+        # --- 修复 1: 自动寻找列名增加容错性 ---
+        col_name = next((c for c in CONTENT_COLUMNS if c in header), header[0] if header else None)
+        asin_col = next((c for c in ASIN_COLUMNS if c in header), None)
+        columns = list(dict.fromkeys(c for c in [col_name, asin_col, *REVIEW_FIELDS] if c in header))
+        positions = [header.index(c) for c in columns]
+
+        def to_frame(batch):
+            df_batch = pd.DataFrame(batch, columns=columns).replace(NA_STRINGS, np.nan)
+            # 星级与有用票数统一为数值列；Date 参与评论主键，保持单元格原值，在 split_reviews 中再转换
+            for column in NUMERIC_FIELDS:
+                if column in df_batch:
+                    df_batch[column] = pd.to_numeric(df_batch[column], errors='coerce')
+            # --- 修复 2: 只缓存规范化后的 ASIN，sku_spec 在读取缓存后再映射 ---
+            # 关键：强制转字符串、去空格、转大写；空单元格记为空串（映射为 Other-Unmapped），
+            # 只有工作簿根本没有 ASIN 列时 asin 才缺失（映射为 Unknown-Spec）
+            df_batch['asin'] = df_batch[asin_col].fillna("").astype(str).str.strip().str.upper() if asin_col else None
+            return df_batch
+
+        batch = []
+        while True:
+            with trace_stage(f"read_excel[{name}]") as stage:
+                for row in rows:
+                    values = [_convert_cell(row[i]) if i < len(row) else "" for i in positions]
+                    if any(v != "" for v in values):  # 跳过空行（含只读模式下尾部的格式化空行）
+                        batch.append(values)
+                    if len(batch) >= batch_size:
+                        break
+                stage['rows'] = len(batch)
+            if not batch:
+                return
+            yield to_frame(batch), col_name
+            batch = []
+    finally:
+        wb.close()
+
+
+def read_reviews(filename):
+    """一次性读取单个工作簿，返回 (评论表, 正文列名)；评论表已带规范化后的 asin 列"""
+    batches = list(iter_review_batches(filename))
+    if not batches:
+        return pd.DataFrame(columns=['asin']), None
+    return pd.concat([b for b, _ in batches], ignore_index=True), batches[0][1]
+
+
+def review_keys(df_temp, col_name, seen=None):
+    """评论的稳定主键，用于增量摄取时识别已处理过的评论。
+
+    优先使用 Reviews URL，缺失时对 Asin+Author+Date+正文 做哈希；正文摘要始终参与主键，
+    评论被编辑后视为新评论重新打分。同一主键重复出现时按出现次序编号，保证主键唯一；
+    分批读取时传入同一个 seen（主键 → 已出现次数），编号在批次间连续。
+    """
+    content = df_temp[col_name].astype(str)
+    content_digest = pd.util.hash_pandas_object(content, index=False).map('{:016x}'.format)
+    identity_cols = [c for c in ['asin', 'Author', 'Date'] if c in df_temp.columns]
+    identity = pd.util.hash_pandas_object(
+        df_temp[identity_cols].astype(str).assign(content=content), index=False
+    ).map('{:016x}'.format)
+    if 'Reviews URL' in df_temp.columns:
+        identity = df_temp['Reviews URL'].astype(str).where(df_temp['Reviews URL'].notna(), identity)
+    base = identity + ':' + content_digest
+    occurrence = base.groupby(base).cumcount()
+    if seen is not None:
+        occurrence += base.map(seen).fillna(0).astype(int)
+        for key, count in base.value_counts().items():
+            seen[key] = seen.get(key, 0) + count
+    return base + '#' + occurrence.astype(str)
+
+
+class ContentSentences:
+    """内容键 → 句子（s_text, s_pol）的增量索引，摄取时在批次与工作簿间共享（见 split_reviews）。
+
+    每次收录的句子整块保留、不再与已有句子拼成大表；字典只记每个内容键所在的块与行区间，
+    查找与收录的开销只与本批条数有关，不随已处理的内容增长。
+    peers 为其它工作簿的句子缓存路径（见 _peer_caches）：本批缺少的内容键按需带行过滤读取，不整表载入。
+    """
+
+    def __init__(self, peers=()):
+        self.peers = list(peers)
+        self._blocks = []  # 每块为 (s_text, s_pol) 两个数组
+        self._spans = {}  # content_key -> (块号, 起始行, 结束行)
+
+    def add(self, table):
+        """收录句子表（content_key, s_text, s_pol，可带 review_key）里尚未收录的内容。
+
+        同一内容键出现在多条评论里时只取第一条评论的句子；表内 review_key 唯一，同一评论的句子相邻。
+        """
+        if 'review_key' in table:
+            review = pd.factorize(table['review_key'])[0]
+            table = table[np.isin(review, review[~table['content_key'].duplicated().to_numpy()])]
+        keys = table['content_key'].tolist()
+        keep = np.fromiter((k not in self._spans for k in keys), dtype=bool, count=len(keys))
+        keys = [k for k, new in zip(keys, keep) if new]
+        if not keys:
+            return
+        starts = [i for i in range(len(keys)) if i == 0 or keys[i] != keys[i - 1]]
+        block = len(self._blocks)
+        self._blocks.append((table['s_text'].to_numpy()[keep], table['s_pol'].to_numpy(dtype=float)[keep]))
+        for start, stop in zip(starts, starts[1:] + [len(keys)]):
+            self._spans[keys[start]] = (block, start, stop)
+
+    def lookup(self, keys):
+        """确保 keys 已收录：缺少的先到其它工作簿的缓存里找，返回仍缺少、需要重新处理的内容键"""
+        missing = [k for k in dict.fromkeys(keys) if k not in self._spans]
+        for path in self.peers:
+            if not missing:
+                break
+            try:
+                self.add(pd.read_parquet(path, columns=['review_key', 'content_key', 's_text', 's_pol'],
+                                         filters=[('content_key', 'in', np.array(missing, dtype=np.uint64))]))
+            except (OSError, ValueError):
+                continue  # 正在被改写的缓存读不到时跳过即可
+            missing = [k for k in missing if k not in self._spans]
+        return missing
+
+    def take(self, keys):
+        """按 keys 的顺序取出句子，返回 (每个键的句子数, s_text, s_pol)"""
+        spans = np.array([self._spans[k] for k in keys], dtype=np.int64).reshape(-1, 3)
+        counts = spans[:, 2] - spans[:, 1]
+        block = np.repeat(spans[:, 0], counts)
+        row = np.repeat(spans[:, 1] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        texts, pols = np.empty(len(row), dtype=object), np.empty(len(row), dtype=float)
+        # 按块分组取行：每块只索引一次
+        order = np.argsort(block, kind='stable')
+        bounds = np.flatnonzero(np.diff(block[order])) + 1
+        for at in np.split(order, bounds) if len(order) else []:
+            text, pol = self._blocks[block[at[0]]]
+            texts[at], pols[at] = text[row[at]], pol[row[at]]
+        return counts, texts, pols
+
+
+def split_reviews(df_temp, col_name, info, workers=1, known=None, seen=None, pool=None, sentiment=DEFAULT_BACKEND,
+                  segmenter=DEFAULT_SEGMENTER, shared=None):
+    """分句与情感打分，把评论表展开为句子级明细表。
+
+    known 为已处理过的句子（review_key, content_key, s_text, s_pol）；主键命中的评论直接复用，只对新评论分句打分。
+    新评论再按内容键去重（见 dedup.content_keys）：shared 为已处理过的内容（ContentSentences），
+    内容相同的评论直接复用，其余内容每个只处理一次，处理结果收录进 shared。
+    评论级字段（asin、Rating 等）始终取自当前工作簿。分批调用时 seen / pool / shared 在批次间共享，
+    见 review_keys 与 text_pipeline.review_pool。
+    """
+    # --- 句子拆分与情感分析 ---
+    df_temp = df_temp.dropna(subset=[col_name]).copy()
+    df_temp['review_key'] = review_keys(df_temp, col_name, seen).to_numpy()
+    df_temp['content_key'] = content_keys(df_temp[col_name])
+    # 原声浏览按有用票数 / 日期排序；主键已经算好，这里再统一类型（缺列时补空）
+    df_temp['Helpful'] = pd.to_numeric(df_temp.get('Helpful', np.nan), errors='coerce')
+    df_temp['Date'] = pd.to_datetime(df_temp.get('Date', pd.NaT), errors='coerce')
+
+    is_new = ~df_temp['review_key'].isin(known['review_key']) if known is not None else np.ones(len(df_temp), dtype=bool)
+    fresh = df_temp[is_new]
+    shared = ContentSentences() if shared is None else shared
+    fresh_keys = fresh['content_key'].tolist()
+    todo = fresh[fresh['content_key'].isin(shared.lookup(fresh_keys))].drop_duplicates('content_key')
+
+    with trace_stage(f"split_and_score[{info[1]}]", rows=len(todo)) as stage:
+        results = analyze_reviews(todo[col_name], workers=workers, pool=pool, sentiment=sentiment,
+                                  segmenter=segmenter)
+        stage['reused_reviews'] = int(len(df_temp) - len(fresh))
+        stage['deduplicated_reviews'] = int(len(fresh) - len(todo))
+
+    # 直接展平成句子列，不再对整张评论表 explode；没有句子的评论与 explode 一致保留一行空句
+    results = [r or [{'text': "", 'polarity': 0}] for r in results]
+    analyzed = pd.DataFrame({
+        'content_key': np.repeat(todo['content_key'].to_numpy(), [len(r) for r in results]),
+        's_text': [s['text'] for r in results for s in r],
+        's_pol': [s['polarity'] for r in results for s in r],
+    })
+    # 新处理的内容收录进 shared，供后续批次与工作簿复用
+    shared.add(analyzed)
+    # 按内容键把句子分发给每条新评论（保持评论顺序与评论内的句子顺序）
+    counts, texts, pols = shared.take(fresh_keys)
+    sentences = pd.DataFrame({
+        'review_key': np.repeat(fresh['review_key'].to_numpy(), counts),
+        'content_key': np.repeat(fresh['content_key'].to_numpy(), counts),
+        's_text': texts,
+        's_pol': pols,
+    })
+    if known is not None:
+        reused = known.loc[known['review_key'].isin(df_temp.loc[~is_new, 'review_key']),
+                           ['review_key', 'content_key', 's_text', 's_pol']]
+        # 全部命中时不再拼接空表，避免列类型被空表拉回 object
+        sentences = pd.concat([reused, sentences], ignore_index=True) if len(fresh) else reused
+
+    # 按评论在工作簿中的顺序排列，评论内句子保持原有先后
+    position = pd.Series(np.arange(len(df_temp)), index=df_temp['review_key'])
+    sentences = sentences.iloc[np.argsort(sentences['review_key'].map(position).to_numpy(), kind='stable')]
+    table = sentences.join(df_temp.set_index('review_key')[['asin', 'Rating', 'Helpful', 'Date']], on='review_key')
+
+    table['main_category'] = info[0]
+    table['sub_type'] = info[1]
+
+    return table[SENTENCE_COLUMNS].reset_index(drop=True)
+
+
+def build_sentence_table(filename, info, workers=1, known=None, sentiment=DEFAULT_BACKEND, segmenter=DEFAULT_SEGMENTER,
+                         shared=None):
+    """流式读取单个工作簿，逐批分句与情感打分，返回句子级明细表。
+
+    传入 known 时只处理新增评论；shared 为已处理过的内容（见 ContentSentences），内容相同的评论不再重复处理。
+    """
+    tables, seen = [], {}
+    shared = ContentSentences() if shared is None else shared
+    with review_pool(workers) as pool:
+        for batch, col_name in iter_review_batches(filename):
+            tables.append(split_reviews(batch, col_name, info, workers=workers, known=known, seen=seen, pool=pool,
+                                        sentiment=sentiment, segmenter=segmenter, shared=shared))
+    if not tables:
+        return pd.DataFrame(columns=SENTENCE_COLUMNS)
+    return pd.concat(tables, ignore_index=True)
+
+
+def load_sentence_table(filename, info, workers=1, sentiment=DEFAULT_BACKEND, segmenter=DEFAULT_SEGMENTER):
+    """优先读取句子缓存；指纹不一致时增量更新：只对新增评论分句打分，并与已有句子合并。
+
+    不同分句器 / 情感后端的结果分别缓存，切换后不会覆盖另一份。
+    """
+    cache_key = {**file_fingerprint(filename), 'info': list(info), 'version': SENTENCE_CACHE_VERSION,
+                 'sentiment': sentiment, 'segmenter': segmenter}
+    stem, data_path, meta_path = _sentence_cache_paths(filename, sentiment, segmenter)
+
+    # 前台加载与后台预热可能同时处理同一个工作簿：同一份缓存只让一个线程构建，另一个等它写完后直接读取
+    with _sentence_cache_lock(data_path):
+        known = None
+        if os.path.exists(data_path) and os.path.exists(meta_path):
+            try:
+                with open(meta_path, encoding='utf-8') as f:
+                    meta = json.load(f)
+                if meta == cache_key:
+                    with trace_stage(f"read_sentence_cache[{stem}]") as stage:
+                        table = pd.read_parquet(data_path)
+                        stage['rows'] = len(table)
+                    return table
+                # 同一工作簿、同一缓存格式：已处理过的评论可以直接复用
+                if all(meta.get(k) == cache_key[k] for k in ('version', 'info', 'sentiment', 'segmenter')):
+                    known = pd.read_parquet(data_path, columns=['review_key', 'content_key', 's_text', 's_pol'])
+            except (OSError, ValueError):
+                known = None  # 缓存损坏时直接重建
+
+        # 同一条评论常同时出现在销量榜与趋势榜（甚至不同类目）的工作簿里：其它工作簿已处理过的内容直接复用
+        shared = ContentSentences(_peer_caches(filename, sentiment, segmenter))
+        if known is not None:
+            shared.add(known)
+        table = build_sentence_table(filename, info, workers=workers, known=known, sentiment=sentiment,
+                                     segmenter=segmenter, shared=shared)
+
+        # 先写临时文件再原子替换，避免并发读到半截缓存
+        os.makedirs(SENTENCE_CACHE_DIR, exist_ok=True)
+        table.to_parquet(data_path + ".tmp", index=False)
+        os.replace(data_path + ".tmp", data_path)
+        with open(meta_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(cache_key, f, ensure_ascii=False)
+        os.replace(meta_path + ".tmp", meta_path)
+        return table
+
+
+def _sentence_cache_paths(filename, sentiment, segmenter):
+    """句子缓存的 (文件名主干, 数据路径, 元数据路径)"""
+    stem = f"{os.path.splitext(os.path.basename(filename))[0]}.{segmenter}.{sentiment}"
+    return stem, os.path.join(SENTENCE_CACHE_DIR, f"{stem}.parquet"), os.path.join(SENTENCE_CACHE_DIR, f"{stem}.json")
+
+
+def _peer_caches(filename, sentiment, segmenter):
+    """其它工作簿现有句子缓存的数据路径（同一缓存格式、分句器与情感后端）。
+
+    内容键相同则 NLP 结果相同，与缓存是否已过期无关，因此只检查格式；元数据读不到的缓存跳过即可。
+    """
+    paths = []
+    for peer in DATA_MAP:
+        if peer == os.path.basename(filename):
+            continue
+        _, data_path, meta_path = _sentence_cache_paths(peer, sentiment, segmenter)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if (meta.get('version'), meta.get('sentiment'), meta.get('segmenter')) == \
+                (SENTENCE_CACHE_VERSION, sentiment, segmenter):
+            paths.append(data_path)
+    return paths
+
+
+_locks_guard = Lock()
+_sentence_cache_locks = {}
+
+
+def _sentence_cache_lock(data_path):
+    with _locks_guard:
+        return _sentence_cache_locks.setdefault(data_path, Lock())
+
+
+def available_categories(data_dir="."):
+    """工作簿存在的 main_category（按 DATA_MAP 顺序），只查看文件是否存在，不读取内容"""
+    return list(dict.fromkeys(
+        info[0] for filename, info in DATA_MAP.items() if os.path.exists(os.path.join(data_dir, filename))
+    ))
+
+
+def data_version(data_dir=".", categories=None):
+    """工作簿的轻量版本号（只看大小与修改时间），用作看板各级缓存的失效键"""
+    version = []
+    for filename, info in DATA_MAP.items():
+        path = os.path.join(data_dir, filename)
+        if os.path.exists(path) and (categories is None or info[0] in categories):
+            stat = os.stat(path)
+            version.append((filename, stat.st_size, stat.st_mtime_ns))
+    return tuple(version)
+
+
+def load_sentences(data_dir=".", categories=None, workers=INGEST_WORKERS, mapping=USER_CATEGORY_MAPPING,
+                   sentiment=SENTIMENT_BACKEND, segmenter=SEGMENTER):
+    """加载全部（或指定 main_category 的）工作簿，返回带 sku_spec 的紧凑句子级明细表（见 compact_sentence_table）。
+
+    mapping=None 时不附加 sku_spec，供不依赖 USER_CATEGORY_MAPPING 的下游缓存使用。
+    """
+    combined = []
+    for filename, info in DATA_MAP.items():
+        path = os.path.join(data_dir, filename)
+        if os.path.exists(path) and (categories is None or info[0] in categories):
+            table = load_sentence_table(path, info, workers=workers, sentiment=sentiment, segmenter=segmenter)
+            combined.append(table.drop(columns=['review_key', 'content_key']))
+
+    if not combined:
+        return pd.DataFrame()
+
+    df = pd.concat(combined, ignore_index=True)
+    return compact_sentence_table(attach_sku_spec(df, mapping) if mapping is not None else df)
+
+
+def category_scope(category, data_dir="."):
+    """共享条目的归属：同一数据目录下的同一类目只保留最新版本"""
+    return [os.path.abspath(data_dir), category]
+
+
+def load_shared_sentences(category, version, data_dir=".", workers=INGEST_WORKERS,
+                          sentiment=SENTIMENT_BACKEND, segmenter=SEGMENTER):
+    """某个类目不含 sku_spec 的句子明细表，写一次内存映射文件后由各进程只读打开（见 shared_store）。
+
+    version 为该类目工作簿的 data_version()；返回的表只读，附加列请在浅拷贝上进行。
+    """
+    return open_shared(
+        "sentences", [os.path.abspath(data_dir), category, version, SENTENCE_CACHE_VERSION, sentiment, segmenter],
+        lambda: load_sentences(data_dir, categories=[category], workers=workers, mapping=None,
+                               sentiment=sentiment, segmenter=segmenter),
+        write_frame, read_frame, scope=category_scope(category, data_dir),
+    )
+
+
+def row_slices(df, columns):
+    """按 columns 分组的 [(取值, 行切片)]，顺序同 groupby(sort=False)。
+
+    明细表按工作簿顺序拼接，同一 (类目, 子类) 的句子通常是连续的一段：这时用 iloc 取视图，
+    不复制数据（对内存映射的共享表尤其重要）；不连续时才退回按行号取出。切片保留原始行号。
+    """
+    slices = []
+    for key, rows in df.groupby(columns, sort=False, observed=True).indices.items():
+        contiguous = rows[-1] - rows[0] + 1 == len(rows)
+        slices.append((key, df.iloc[rows[0]:rows[-1] + 1] if contiguous else df.iloc[rows]))
+    return slices
+
+
+def compact_sentence_table(df):
+    """压缩句子明细表的常驻内存：标签列转 category，星级降为最小整数类型，正文用 Arrow 字符串列。
+
+    评论级的长字符串（review_key、content_key）只保留在句子缓存里。asin、星级等评论级字段仍逐句保留：
+    压缩后它们只是每行几个字节的编码 / 整数，几乎所有下游计算都按句使用，拆成父评论表再回连并不划算。
+    """
+    df['s_text'] = df['s_text'].astype(TEXT_DTYPE)
+    df['Rating'] = pd.to_numeric(df['Rating'], downcast='integer')
+    if 'Helpful' in df:
+        df['Helpful'] = pd.to_numeric(df['Helpful'].fillna(0), downcast='integer')
+    for column in LABEL_COLUMNS:
+        if column in df:
+            df[column] = df[column].astype('category')
+    return df
+
+
+def attach_sku_spec(df, mapping=USER_CATEGORY_MAPPING):
+    """按 ASIN 映射 SKU 规格。映射放在缓存之外，修改 USER_CATEGORY_MAPPING 无需重跑 NLP。
+
+    未收录的 ASIN（包括空单元格读成的空串）记为 Other-Unmapped；asin 缺失表示工作簿没有 ASIN 列，记为 Unknown-Spec。
+    """
+    if isinstance(df['asin'].dtype, pd.CategoricalDtype):
+        # 已压缩的明细表只映射每个 ASIN 取值一次，再按编码展开（编码 -1 即缺失 ASIN），不逐行生成字符串
+        specs = pd.Series(df['asin'].cat.categories.astype(object)).map(mapping).fillna("Other-Unmapped")
+        df['sku_spec'] = pd.Categorical(np.append(specs.to_numpy(object), "Unknown-Spec")[df['asin'].cat.codes.to_numpy()])
+        return df
+    asin = df['asin'].astype(object)
+    df['sku_spec'] = asin.map(mapping).fillna("Other-Unmapped").where(asin.notna(), "Unknown-Spec")
+    return df
+
+
+def dictionary_versions(dictionary=FEATURE_DIC, rules=CLASSIFICATION_RULES, mapping=USER_CATEGORY_MAPPING):
+    """各词库的指纹，下游缓存按自己实际依赖的那几项作为失效键"""
+    return {
+        'features': fingerprint(dictionary),
+        'rules': fingerprint(rules),
+        # SKU 立方体只用到画像里的 User_Role 一列
+        'user_role': fingerprint(rules.get('User_Role', {})),
+        'mapping': fingerprint(mapping),
+    }
+
+
+# --- 3. 预计算：命中矩阵 / 画像标签 / SKU 聚合立方体 ---
+def _dimension_cache_path(kind, corpus, dimension_fp):
+    return os.path.join(DIMENSION_CACHE_DIR, f"{kind}_{corpus[:16]}_{dimension_fp}.npz")
+
+
+def _read_dimension_cache(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+    except (OSError, ValueError):
+        return None  # 缓存损坏时重新计算
+
+
+def _write_dimension_cache(path, **arrays):
+    os.makedirs(DIMENSION_CACHE_DIR, exist_ok=True)
+    with open(path + ".tmp", 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(path + ".tmp", path)
+
+
+_corpora_lock = Lock()
+
+
+def _track_corpus(scope, corpus):
+    """在 corpora.json 中记录 scope（见 category_scope）当前的语料；语料换了（如工作簿追加了评论）时，
+    删除不再被任何 scope 使用的语料的维度缓存。
+
+    多个进程同时改写时可能丢掉一次记录，代价只是之后多算一次被误删的维度，结果不受影响。
+    """
+    path = os.path.join(DIMENSION_CACHE_DIR, "corpora.json")
+    with _corpora_lock:
+        try:
+            with open(path, encoding='utf-8') as f:
+                corpora = json.load(f)
+        except (OSError, ValueError):
+            corpora = {}
+        scope_fp = fingerprint(scope)
+        if corpora.get(scope_fp) == corpus:
+            return
+        corpora[scope_fp] = corpus
+        os.makedirs(DIMENSION_CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(corpora, f)
+        os.replace(tmp, path)
+
+        current = {c[:16] for c in corpora.values()}
+        for name in os.listdir(DIMENSION_CACHE_DIR):
+            # 文件名为 {kind}_{语料指纹前 16 位}_{维度指纹}.npz
+            if name.endswith(".npz") and name.split("_")[1] not in current:
+                try:
+                    os.remove(os.path.join(DIMENSION_CACHE_DIR, name))
+                except OSError:
+                    pass
+
+
+def build_tag_hits(texts, dictionary=FEATURE_DIC, cache=True, scope=None):
+    """全量句子 × 标签命中矩阵。
+
+    按 (语料, 维度指纹) 缓存每个维度的命中：词库里只有改动过的维度需要重新扫描，其余维度直接读盘后拼接。
+    scope 为 category_scope()：给定时该类目换了语料后，旧语料的维度缓存随即清理。
+    """
+    corpus = corpus_fingerprint(texts) if cache else None
+    if cache and scope is not None:
+        _track_corpus(scope, corpus)
+    dimension_fps = dimension_fingerprints(dictionary)
+    parts, missing = {}, []
+    for dimension, dimension_fp in dimension_fps.items():
+        cached = _read_dimension_cache(_dimension_cache_path("hits", corpus, dimension_fp)) if cache else None
+        if cached is not None and int(cached['n_rows']) == len(texts):
+            tags = [(dimension, tag) for tag in dictionary[dimension]]
+            parts[dimension] = TagHitMatrix.from_csc(
+                tags, len(texts), cached['indices'], cached['indptr'], cached['exact'], cached['loose'])
+        else:
+            missing.append(dimension)
+
+    with trace_stage("tag_hits", rows=len(texts)) as stage:
+        stage['dimensions'] = len(missing)
+        if missing:
+            hits = compiled_matcher({dimension: dictionary[dimension] for dimension in missing}).hit_matrix(texts)
+            for dimension in missing:
+                parts[dimension] = part = hits.dimension_part(dimension)
+                if cache:
+                    _write_dimension_cache(
+                        _dimension_cache_path("hits", corpus, dimension_fps[dimension]), n_rows=len(texts),
+                        indices=part.indices, indptr=part.indptr, exact=part.exact, loose=part.loose,
+                    )
+    return TagHitMatrix.concat([parts[dimension] for dimension in dictionary], len(texts))
+
+
+def load_shared_tag_hits(texts, dictionary=FEATURE_DIC, scope=None):
+    """build_tag_hits() 的多进程共享版：整张矩阵的 CSC 数组写一次 .npy，之后各进程以内存映射只读打开。
+
+    scope 为 category_scope()：给定时该类目发布新矩阵后删除旧矩阵。
+    """
+    tags = [(dimension, tag) for dimension, sub_dict in dictionary.items() for tag in sub_dict]
+    return open_shared(
+        "tag_hits", [corpus_fingerprint(texts), len(texts), fingerprint(dictionary)],
+        lambda: build_tag_hits(texts, dictionary, scope=scope),
+        lambda path, hits: write_arrays(path, indices=hits.indices, indptr=hits.indptr, exact=hits.exact, loose=hits.loose),
+        lambda path: TagHitMatrix.from_csc(tags, len(texts), **read_arrays(path)),
+        scope=scope,
+    )
+
+
+def build_persona_features(texts, rules=CLASSIFICATION_RULES, cache=True, default="未提及", scope=None):
+    """全量句子的画像、场景、动机标签，一次性批量打标；与命中矩阵一样按 (语料, 维度指纹) 缓存每一列"""
+    corpus = corpus_fingerprint(texts) if cache else None
+    if cache and scope is not None:
+        _track_corpus(scope, corpus)
+    dimension_fps = dimension_fingerprints(rules)
+    labels = {dimension: np.array(list(sub_dict) + [default], dtype=object) for dimension, sub_dict in rules.items()}
+    columns, missing = {}, []
+    for dimension, dimension_fp in dimension_fps.items():
+        cached = _read_dimension_cache(_dimension_cache_path("persona", corpus, dimension_fp)) if cache else None
+        if cached is not None and len(cached['codes']) == len(texts):
+            columns[dimension] = labels[dimension][cached['codes']]
+        else:
+            missing.append(dimension)
+
+    with trace_stage("persona_features", rows=len(texts)) as stage:
+        stage['dimensions'] = len(missing)
+        if missing:
+            first_tags = compiled_matcher({dimension: rules[dimension] for dimension in missing}).first_tags(texts, default)
+            for dimension in missing:
+                columns[dimension] = first_tags[dimension]
+                if cache:
+                    # 按标签在词库中的位置存成整数编码
+                    codes = {label: i for i, label in reversed(list(enumerate(labels[dimension])))}
+                    _write_dimension_cache(
+                        _dimension_cache_path("persona", corpus, dimension_fps[dimension]),
+                        codes=pd.Series(first_tags[dimension]).map(codes).to_numpy(np.int16),
+                    )
+    return pd.DataFrame({"feat_" + dim_name: columns[dim_name] for dim_name in rules})
+
+
+def extract_advanced_features(df, persona_features):
+    """为每一句评论打上画像、场景、动机标签（从预计算结果中按行号取出）"""
+    return df.join(persona_features)
+
+
+# 聚合立方体中代表“全部人群”的 user_role 取值
+ALL_ROLES = "全部"
+SKU_CUBE_KEYS = ['main_category', 'sub_type', 'user_role', 'sku_spec']
+
+
+def build_sku_cube(df, user_roles, tag_hits, dictionary):
+    """(类目, 子类, 人群, SKU, 维度) → 评分和 / 有效评分数 / 命中句数 的聚合立方体。
+
+    维度命中沿用气泡图的忽略大小写语义；另附每个 SKU 在各切片中首次出现的行号，用来保持原来的绘图顺序。
+    """
+    with trace_stage("sku_cube", rows=len(df)):
+        base = df[['main_category', 'sub_type', 'sku_spec', 'Rating']].assign(user_role=np.asarray(user_roles))
+        base = pd.concat([base, base.assign(user_role=ALL_ROLES)])
+
+        parts = []
+        for dimension in dictionary:
+            hit = tag_hits.mask(tag_hits.dimension_tag_ids(dimension))
+            parts.append(base[hit[base.index.to_numpy()]].assign(维度=dimension))
+        cube = (
+            pd.concat(parts)
+            .groupby(SKU_CUBE_KEYS + ['维度'], sort=False, observed=True)['Rating']
+            .agg(rating_sum='sum', rating_count='count', match_count='size')
+            .reset_index()
+        )
+        sku_order = base.rename_axis('first_row').reset_index().groupby(SKU_CUBE_KEYS, sort=False, observed=True)['first_row'].min().reset_index()
+    return cube, sku_order
+
+
+def prepare_dataset(df, dictionary=FEATURE_DIC, rules=CLASSIFICATION_RULES, scope=None):
+    """一次性完成某份句子明细表的全部预计算，供批量报表使用；scope 同 build_tag_hits()"""
+    tag_hits = build_tag_hits(df['s_text'], dictionary, scope=scope)
+    persona_features = build_persona_features(df['s_text'], rules, scope=scope)
+    sku_cube, sku_order = build_sku_cube(df, persona_features['feat_User_Role'], tag_hits, dictionary)
+    return {
+        'tag_hits': tag_hits,
+        'persona_features': persona_features,
+        'sku_cube': sku_cube,
+        'sku_order': sku_order,
+    }
+
+
+def warm_up_categories(categories, data_dir=".", dictionary=FEATURE_DIC, rules=CLASSIFICATION_RULES, workers=1):
+    """逐个类目构建磁盘缓存（句子缓存、多进程共享的句子表与命中矩阵、按维度的画像列），之后加载这些类目只需读盘。
+
+    默认只用一个进程，与看板进程同时运行时不抢前台会话的 CPU（见 warm_up.py）。
+    """
+    for category in categories:
+        df = load_shared_sentences(category, data_version(data_dir, [category]), data_dir, workers=workers)
+        if not df.empty:
+            scope = category_scope(category, data_dir)
+            load_shared_tag_hits(df['s_text'], dictionary, scope=scope)
+            build_persona_features(df['s_text'], rules, scope=scope)
+
+
+# --- 4. 核心分析逻辑 (优化版：引入评分加权与深度透视) ---
+def analyze_sentiments(df_sub, tag_hits, dictionary=FEATURE_DIC):
+    """df_sub 须是句子明细表的行切片（保留原始行号），命中直接从 tag_hits 查表"""
+    results = []
+    total_reviews_count = len(df_sub)
+
+    in_sub = np.zeros(tag_hits.n_rows, dtype=bool)
+    in_sub[df_sub.index.to_numpy()] = True
+
+    for category, sub_dict in dictionary.items():
+        pos_score, neg_score = 0.0, 0.0
+        hit_details, matched_ratings = [], []
+        dimension_vocal_count = 0
+
+        for tag in sub_dict:
+            rows = tag_hits.tag_rows(tag_hits.tag_ids[(category, tag)], exact=True)
+            matched_df = df_sub.loc[rows[in_sub[rows]]]
+
+            if not matched_df.empty:
+                if '负面' in tag:
+                    valid_match = matched_df[(matched_df['s_pol'] < 0.1) | (matched_df['Rating'] <= 3)]
+                    weight = 1.5 if valid_match['Rating'].mean() <= 2.1 else 1.0
+                    neg_score += (len(valid_match) * weight)
+                    count = len(valid_match)
+                elif '正面' in tag:
+                    valid_match = matched_df[(matched_df['s_pol'] > -0.1) | (matched_df['Rating'] >= 4)]
+                    pos_score += len(valid_match)
+                    count = len(valid_match)
+                else: count = 0
+
+                if count > 0:
+                    dimension_vocal_count += count
+                    matched_ratings.extend(valid_match['Rating'].tolist())
+                    if '负面' in tag:
+                        hit_details.append(f"{tag.split('-')[-1]}({count}次)")
+
+        dim_rating = np.mean(matched_ratings) if matched_ratings else 0
+        total_vocal = pos_score + neg_score
+        sentiment_score = (pos_score / total_vocal * 100) if total_vocal > 0 else 0
+
+        # 置信度缩放
+        confidence = np.log1p(dimension_vocal_count) / np.log1p(max(total_reviews_count/5, 1))
+        confidence = min(max(confidence, 0.5), 1.2)
+
+        opp_index = round((neg_score * (100 - sentiment_score) * (5.1 - dim_rating) / 100) * confidence, 2)
+
+        results.append({
+            "维度": category, "亮点": int(pos_score), "痛点": int(neg_score),
+            "满意度": round(sentiment_score, 1), "维度评分": round(dim_rating, 2),
+            "机会指数": opp_index, "痛点分布": ", ".join(hit_details) if hit_details else "无"
+        })
+    return pd.DataFrame(results)
+
+
+def summarize_metrics(analysis_res, df_sub):
+    """顶部指标卡：亮点/痛点总提及、整体健康度、平均星级"""
+    total_pos = analysis_res["亮点"].sum()
+    total_neg = analysis_res["痛点"].sum()
+    health_rate = round(total_pos / (total_pos + total_neg) * 100) if (total_pos + total_neg) > 0 else 0
+    # 计算该子类的平均分
+    avg_star = round(df_sub['Rating'].mean(), 2) if 'Rating' in df_sub.columns else 0
+    return {"亮点总提及": total_pos, "痛点总提及": total_neg, "整体健康度": health_rate, "平均星级评分": avg_star}
+
+
+def opportunity_ranking(analysis_res, top=None):
+    """按机会指数从高到低排序的维度列表"""
+    ranked = analysis_res.sort_values("机会指数", ascending=False)
+    return ranked.head(top) if top is not None else ranked
+
+
+def persona_distribution(df_sub, column):
+    """画像维度分布，统一剔除“未提及”或空值"""
+    return df_sub[
+        (df_sub[column].notna()) &
+        (df_sub[column] != "未提及") &
+        (df_sub[column] != "Unknown")
+    ][column].value_counts().reset_index()
+
+
+def sku_bubble_metrics(sku_cube, sku_order, main_category, sub_type, role, dims):
+    """从聚合立方体中切出 (类目, 子类, 人群)，返回按首次出现排序的 SKU 列表与 {(SKU, 维度): (均分, 命中数)}"""
+    in_slice = lambda t: (t['main_category'] == main_category) & (t['sub_type'] == sub_type) & (t['user_role'] == role)
+    all_skus = sku_order[in_slice(sku_order)].sort_values('first_row')['sku_spec'].tolist()
+    metrics = {
+        (r.sku_spec, r.维度): (r.rating_sum / r.rating_count if r.rating_count else np.nan, r.match_count)
+        for r in sku_cube[in_slice(sku_cube) & sku_cube['维度'].isin(dims)].itertuples()
+    }
+    return all_skus, metrics
+
+
+def sku_bubble_points(sku_cube, sku_order, main_category, sub_type, role, dims):
+    """气泡图的绘图数据：每个 SKU 在 (x, y, 气泡) 三个维度上的平均评分。
+
+    "其他" 为维度不足 3 个时的补位维度，记 3.0；某维度无评分时也按 3.0 绘制，三个维度都没有评分的 SKU 不画。
+    """
+    all_skus, metrics = sku_bubble_metrics(sku_cube, sku_order, main_category, sub_type, role, dims)
+    d_x, d_y, d_b = dims
+
+    def get_metric(sku, dimension):
+        if dimension == "其他":
+            return 3.0, 0
+        return metrics.get((sku, dimension), (None, 0))
+
+    plot_data = []
+    for sku in all_skus:
+        sc_x, _ = get_metric(sku, d_x)
+        sc_y, _ = get_metric(sku, d_y)
+        sc_b, _ = get_metric(sku, d_b)
+        # 只要有一维度有分就记录
+        if any(v is not None for v in [sc_x, sc_y, sc_b]):
+            plot_data.append({
+                'sku': str(sku),
+                'score_x': sc_x if sc_x is not None else 3.0,
+                'score_y': sc_y if sc_y is not None else 3.0,
+                # 明确保存一个用于显示的原始数值，避免 None
+                'score_bubble_val': sc_b if sc_b is not None else 3.0,
+            })
+    return pd.DataFrame(plot_data)
+
+
+def sku_dimension_ratings(sku_cube, main_category, sub_type):
+    """某子类下每个 (人群, SKU, 维度) 的平均评分与命中句数"""
+    part = sku_cube[(sku_cube['main_category'] == main_category) & (sku_cube['sub_type'] == sub_type)]
+    return part.assign(
+        维度评分=(part['rating_sum'] / part['rating_count'].where(part['rating_count'] > 0)).round(2)
+    )[['user_role', 'sku_spec', '维度', '维度评分', 'match_count']]
+
+
+def role_focus_dimensions(role_sub, dictionary=FEATURE_DIC, top=3):
+    """某人群负面句（s_pol < 0）中关键词出现最多的维度"""
+    role_neg_text = " ".join(role_sub[role_sub['s_pol'] < 0]['s_text'].astype(str).tolist()).lower()
+    dim_counts = {}
+    for dim, mapping in dictionary.items():
+        all_keys = [k for sub in mapping.values() for k in sub]
+        count = sum(1 for k in all_keys if k.lower() in role_neg_text)
+        if count > 0:
+            dim_counts[dim] = count
+    return sorted(dim_counts, key=dim_counts.get, reverse=True)[:top]
+
+
+def build_slice_result(sub_df, tag_hits, persona_features, dictionary=FEATURE_DIC):
+    """物化单个 (类目, 子类) 的分析结果：维度得分、指标卡、画像分布、主要人群及其关注维度"""
+    analysis_res = analyze_sentiments(sub_df, tag_hits, dictionary)
+    enriched = extract_advanced_features(sub_df, persona_features)
+    # 样本量最大的前 3 个身份
+    top_roles = enriched[enriched['feat_User_Role'] != "未提及"]['feat_User_Role'].value_counts().head(3).index.tolist()
+    return {
+        'analysis_res': analysis_res,
+        'summary': summarize_metrics(analysis_res, sub_df),
+        'persona_counts': {col: persona_distribution(enriched, col) for col in persona_features.columns},
+        'top_roles': top_roles,
+        'role_dims': {
+            role: role_focus_dimensions(enriched[enriched['feat_User_Role'] == role], dictionary) for role in top_roles
+        },
+    }
+
+
+def build_slice_results(df, tag_hits, persona_features, dictionary=FEATURE_DIC):
+    """逐个 (类目, 子类) 物化分析结果，返回 {(main_category, sub_type): 结果}。
+
+    随数据一起计算一次；看板上的控件交互只需按键取出，不再重跑关键词分析。
+    """
+    results = {}
+    for (main_category, sub_type), sub_df in row_slices(df, ['main_category', 'sub_type']):
+        with trace_stage(f"slice_results[{main_category}/{sub_type}]", rows=len(sub_df)):
+            results[(main_category, sub_type)] = build_slice_result(sub_df, tag_hits, persona_features, dictionary)
+    return results
+
+
+def build_report(df, prepared, main_category, sub_type):
+    """生成看板上某个 (类目, 子类) 的全部表格"""
+    sub_df = dict(row_slices(df, ['main_category', 'sub_type']))[(main_category, sub_type)]
+    result = build_slice_result(sub_df, prepared['tag_hits'], prepared['persona_features'])
+    analysis_res = result['analysis_res']
+
+    persona_counts = pd.concat(
+        [
+            counts.rename(columns={col: '标签'}).assign(画像维度=col.removeprefix("feat_"))
+            for col, counts in result['persona_counts'].items()
+        ],
+        ignore_index=True,
+    )[['画像维度', '标签', 'count']]
+
+    return {
+        'summary': result['summary'],
+        'dimension_scores': analysis_res,
+        'opportunity_ranking': opportunity_ranking(analysis_res).reset_index(drop=True),
+        'persona_counts': persona_counts,
+        'sku_dimension_ratings': sku_dimension_ratings(prepared['sku_cube'], main_category, sub_type),
+    }
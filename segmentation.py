@@ -0,0 +1,95 @@
+"""分句：punkt 参考实现 + 批量正则分句（先清洗 HTML 残留）。
+
+两种分句器都输出等长的 (review_idx, sentence_idx, sentences) 三个数组，review_idx 为评论在输入中的位置。
+- punkt：逐条评论调用 nltk sent_tokenize，与历史数据口径一致；
+- fast：把整批评论拼成一个字符串，一次正则扫描切出全部句子；先把 <br> 换成硬分句、
+  去掉其它标签并反转义 &#160; / &amp; 等实体。断句规则按 punkt 在小写文本上的行为设计
+  （句末 . ? ! 后跟空白处断开，省略号不断开），差异用 benchmarks/segmentation_parity.py 量化。
+"""
+import html
+import re
+
+import numpy as np
+import pandas as pd
+from nltk.tokenize import sent_tokenize
+
+DEFAULT_SEGMENTER = "punkt"
+SEGMENTERS = ("punkt", "fast")
+
+# 拼接整批评论时使用的分隔符：评论之间用 \x00，<br> 换成 \x01，二者都是硬分句点且不属于 \s
+_REVIEW_SEP = "\x00"
+_HARD_BREAK = "\x01"
+_BR = re.compile(r"(?:<br\s*/?>\s*)+", re.IGNORECASE)
+_TAG = re.compile(r"</?[a-z][^<>]{0,200}>", re.IGNORECASE)
+# 候选断句点：句末标点串（其后的右引号/右括号归入上一句）后跟空白，或分隔符
+_SENTENCE_END = re.compile(r"[.?!]+[\"')\]}]*(?=\s)\s*|[\x00\x01]")
+# punkt 在小写文本上不会在数字（"24."）或单字母（"i."）后的句号处断句；这两个正则取自 punkt 的判定
+_NUMBER = re.compile(r"-?[.,]?\d[\d,.\-]*")
+_INITIAL = re.compile(r"[^\W\d]")
+
+
+def normalize_html(texts):
+    """清洗评论里的 HTML 残留：<br> 变成硬分句标记，其它标签替换为空格，实体反转义、不换行空格归一为空格"""
+    texts = pd.Series(texts, dtype=object).astype(str)
+    texts = texts.str.replace(_BR, _HARD_BREAK, regex=True).str.replace(_TAG, " ", regex=True)
+    has_entity = texts.str.contains("&", regex=False)
+    texts[has_entity] = texts[has_entity].map(html.unescape)
+    return texts.str.replace("\xa0", " ", regex=False).tolist()
+
+
+def _punkt(texts):
+    split = [sent_tokenize(t) for t in texts]
+    review_idx = np.repeat(np.arange(len(split)), [len(s) for s in split])
+    sentence_idx = np.concatenate([np.arange(len(s)) for s in split]) if split else np.array([], dtype=int)
+    return review_idx, sentence_idx, [s for sentences in split for s in sentences]
+
+
+def _fast(texts, clean_html=True):
+    if clean_html:
+        texts = normalize_html(texts)
+    joined = _REVIEW_SEP.join(texts) + _REVIEW_SEP
+    review_starts = np.cumsum([0] + [len(t) + 1 for t in texts])[:-1]
+
+    starts, ends, start = [], [], 0
+    for match in _SENTENCE_END.finditer(joined):
+        token = match.group()
+        if token in (_REVIEW_SEP, _HARD_BREAK):
+            end = match.start()
+        else:
+            run = token.rstrip().rstrip("\"')]}")
+            if run.startswith(".."):
+                continue  # 省略号不断句
+            if run == ".":
+                # 数字与单字母都很短，只需回看一小段即可取到句号前的那个词
+                word = re.split(r"[\s\x00\x01]", joined[max(start, match.start() - 32):match.start()])[-1]
+                if _NUMBER.fullmatch(word) or _INITIAL.fullmatch(word):
+                    continue
+            # 句子包含句末标点（及右引号），不包含其后的空白
+            end = match.start() + len(token.rstrip())
+        starts.append(start)
+        ends.append(end)
+        start = match.end()
+
+    sentences, keep = [], []
+    for i, (a, b) in enumerate(zip(starts, ends)):
+        sentence = joined[a:b].strip()
+        if sentence:
+            sentences.append(sentence)
+            keep.append(i)
+    starts = np.asarray(starts, dtype=np.int64)[keep]
+    review_idx = np.searchsorted(review_starts, starts, side='right') - 1
+    sentence_idx = pd.Series(review_idx).groupby(review_idx).cumcount().to_numpy()
+    return review_idx, sentence_idx, sentences
+
+
+def segment_reviews(texts, segmenter=DEFAULT_SEGMENTER, clean_html=True):
+    """批量分句（先转小写），返回 (review_idx, sentence_idx, sentences)。
+
+    clean_html=False 时 fast 分句器跳过 HTML 清洗，只用于一致性报告区分“断句规则”与“HTML 清洗”各自带来的差异。
+    """
+    texts = [str(t).lower() for t in texts]
+    if segmenter == "punkt":
+        return _punkt(texts)
+    if segmenter == "fast":
+        return _fast(texts, clean_html)
+    raise ValueError(f"未知的分句器：{segmenter}（可选：{', '.join(SEGMENTERS)}）")
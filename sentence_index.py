@@ -0,0 +1,146 @@
+"""句子倒排索引：原声溯源的下钻、自由检索与分页浏览。
+
+加载句子明细表后一次性建好：把每句切成词（与查询用同一套切词规则），按 (子类, 星级) 分区，
+每个分区内 词 → 句子行号 的倒排表按行号升序存放。查询时只取相关分区的倒排表求交集，
+不再扫描整张子类表；排序（有用票数 / 日期）与分页也只作用在命中的句子上。
+
+行号即句子在明细表中的位置，与 TagHitMatrix 的行号一致：下钻按维度标签取行时，
+直接把命中矩阵里该标签的行号（本身就是按标签的倒排表）交给 search() 过滤即可。
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# 切词：连续的字母 / 数字（句子已是小写），撇号等标点处断开
+TOKEN = re.compile(r"[^\W_]+")
+# 原声列表可选的排序列（均为倒序）；不排序时保持工作簿中的顺序
+SORT_COLUMNS = ['Helpful', 'Date']
+# 分页展示时带出的列
+VOICE_COLUMNS = ['Rating', 's_text', 'Helpful', 'Date']
+
+
+def tokenize(text):
+    return TOKEN.findall(str(text).lower())
+
+
+class SentenceIndex:
+    """按 (子类, 星级) 分区的 词 → 行号 倒排索引"""
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        self.frame = df[[c for c in VOICE_COLUMNS if c in df]].reset_index(drop=True)
+        self.texts = self.frame['s_text']
+        # 排序键统一成浮点，缺失值（没有票数 / 日期）排在最后
+        self._sort_keys = {}
+        for column in SORT_COLUMNS:
+            if column in self.frame:
+                values = self.frame[column]
+                if column == 'Date':
+                    # 拼接了空工作簿的句子表里 Date 可能是 object 列，统一转成日期（无法解析的视为缺失）
+                    values = pd.to_datetime(values, errors='coerce')
+                    values = (values - pd.Timestamp(0)).dt.total_seconds()
+                else:
+                    values = pd.to_numeric(values, errors='coerce')
+                self._sort_keys[column] = values.astype(float).fillna(-np.inf).to_numpy()
+
+        # 去重键：相同 (星级, 句子) 编码相同
+        self._distinct_codes = pd.factorize(
+            pd.util.hash_pandas_object(self.frame[['Rating', 's_text']], index=False))[0]
+
+        # 分区键：子类编码 × 星级编码；缺失星级单独成一个分区（排在最后），只有不限星级时才会取到
+        sub_codes, sub_types = pd.factorize(df['sub_type'], sort=True)
+        rating_codes, ratings = pd.factorize(df['Rating'], sort=True, use_na_sentinel=False)
+        self._sub_codes = {sub: i for i, sub in enumerate(sub_types)}
+        self._rating_codes = {rating: i for i, rating in enumerate(ratings)}
+        self._partition = partition = sub_codes.astype(np.int64) * len(ratings) + rating_codes
+
+        # 每个分区的全部行号（不带检索词时用）
+        order = np.argsort(partition, kind='stable')
+        self._partition_keys, self._partition_starts = np.unique(partition[order], return_index=True)
+        self._partition_rows = order.astype(np.int64)
+
+        # (分区, 词) → 行号：展开成 (行, 词) 对，去重后按 (分区, 词, 行) 排序
+        tokens = self.texts.str.findall(TOKEN).explode().dropna()
+        token_codes, vocabulary = pd.factorize(tokens)
+        self.vocabulary = {token: i for i, token in enumerate(vocabulary)}
+        pairs = pd.DataFrame({'row': tokens.index.to_numpy(dtype=np.int64), 'token': token_codes}).drop_duplicates()
+        rows = pairs['row'].to_numpy()
+        keys = partition[rows] * max(len(vocabulary), 1) + pairs['token'].to_numpy()
+        order = np.lexsort((rows, keys))
+        self._posting_keys, self._posting_starts = np.unique(keys[order], return_index=True)
+        self._posting_rows = rows[order]
+
+    @staticmethod
+    def _slice(keys, starts, values, key):
+        """排好序的 (键, 起点) 表里取某个键对应的一段"""
+        i = np.searchsorted(keys, key)
+        if i == len(keys) or keys[i] != key:
+            return values[:0]
+        end = starts[i + 1] if i + 1 < len(starts) else len(values)
+        return values[starts[i]:end]
+
+    def _partitions(self, sub_type, ratings):
+        if sub_type not in self._sub_codes:
+            return []
+        wanted = self._rating_codes if ratings is None else [r for r in ratings if r in self._rating_codes]
+        base = self._sub_codes[sub_type] * len(self._rating_codes)
+        return sorted(base + self._rating_codes[r] for r in wanted)
+
+    def search(self, sub_type, ratings=None, query=None, rows=None, sort=None):
+        """某个子类内的命中行号。
+
+        ratings 限定星级分区；query 为检索词，所有词都要出现，多个词时还要求按查询顺序相邻（短语匹配），
+        不含任何可检索词（如 "!!!"）时没有命中；
+        rows 为候选行号（例如某个标签的命中行），与检索结果取交集；
+        sort 为 'Helpful' / 'Date'（倒序，相同时保持原顺序），None 时按行号升序。
+        """
+        terms = tokenize(query) if query else []
+        if query and str(query).strip() and not terms:
+            return np.zeros(0, dtype=np.int64)
+        if terms and any(t not in self.vocabulary for t in terms):
+            return np.zeros(0, dtype=np.int64)
+
+        partitions = self._partitions(sub_type, ratings)
+        if rows is not None and not terms:
+            # 只按候选行过滤时不必展开整个分区，直接看候选行落在哪个分区
+            rows = np.asarray(rows, dtype=np.int64)
+            result = np.sort(rows[np.isin(self._partition[rows], partitions)])
+            return self._sorted(result, sort)
+
+        found = []
+        for key in partitions:
+            if terms:
+                hit = None
+                # 从最短的倒排表开始求交集
+                postings = sorted(
+                    (self._slice(self._posting_keys, self._posting_starts, self._posting_rows,
+                                 key * max(len(self.vocabulary), 1) + self.vocabulary[t]) for t in set(terms)),
+                    key=len,
+                )
+                for posting in postings:
+                    hit = posting if hit is None else np.intersect1d(hit, posting, assume_unique=True)
+                    if not len(hit):
+                        break
+            else:
+                hit = self._slice(self._partition_keys, self._partition_starts, self._partition_rows, key)
+            found.append(hit)
+        result = np.sort(np.concatenate(found)) if found else np.zeros(0, dtype=np.int64)
+
+        if rows is not None:
+            result = np.intersect1d(result, np.asarray(rows, dtype=np.int64))
+        if len(terms) > 1 and len(result):
+            # 多个词时再确认它们按查询的顺序相邻出现：按与倒排表相同的切词比较词序列，"dry out" 不会匹配 "dry outside"
+            texts = " " + self.texts.iloc[result].str.findall(TOKEN).str.join(" ") + " "
+            result = result[texts.str.contains(f" {' '.join(terms)} ", regex=False).to_numpy(dtype=bool)]
+        return self._sorted(result, sort)
+
+    def _sorted(self, rows, sort):
+        if sort is not None and len(rows):
+            rows = rows[np.argsort(-self._sort_keys[sort][rows], kind='stable')]
+        return rows
+
+    def distinct(self, rows):
+        """按 search() 给出的顺序去重，相同 (星级, 句子) 只保留第一条；分页时再用 frame.iloc 取出当页"""
+        _, first = np.unique(self._distinct_codes[rows], return_index=True)
+        return rows[np.sort(first)]
@@ -0,0 +1,188 @@
+"""情感打分后端：TextBlob 逐句参考实现 + 基于同一份 pattern 词典的批量向量化打分。
+
+两个后端都实现 polarities(sentences) -> np.ndarray，输入为已转小写的句子列表。
+向量化后端复刻了 TextBlob 对程度副词、否定词、感叹号、表情的处理，但分词是正则近似，
+与参考实现的差异用 benchmarks/sentiment_agreement.py 在我们自己的工作簿上量化。
+"""
+import re
+from functools import lru_cache
+from itertools import product
+
+import numpy as np
+import pandas as pd
+from textblob import TextBlob
+from textblob._text import EMOTICONS
+from textblob.en import sentiment as pattern_lexicon
+
+DEFAULT_BACKEND = "textblob"
+
+
+class TextBlobBackend:
+    """参考实现：逐句 TextBlob(s).sentiment.polarity，与历史数据口径完全一致"""
+
+    name = "textblob"
+
+    def polarities(self, sentences):
+        return np.array([TextBlob(s).sentiment.polarity for s in sentences], dtype=float)
+
+
+def _state_before(sets, clears, sentence_start):
+    """向量化的状态机前向填充：返回每个 token 之前生效状态的来源位置（-1 表示无状态）。
+
+    sets 处的 token 把状态设为自身，clears 处的 token 清空状态，状态不跨句。
+    """
+    position = np.arange(len(sets))
+    last_event = np.maximum.accumulate(np.where(sets | clears, position, -1))
+    after = np.where((last_event >= 0) & sets[np.maximum(last_event, 0)], last_event, -1)
+    before = np.full(len(sets), -1)
+    before[1:] = after[:-1]
+    before[before < sentence_start] = -1
+    return before
+
+
+class LexiconBackend:
+    """批量打分：一次性切分全部句子的 token，查 pattern 词典后按句聚合，口径与 TextBlob 相同：
+
+    - 只对词典内的词与表情符号打分，句子极性为各评估单元极性的平均值；
+    - 程度副词（词典中带 RB 词性的词）与其后的已知词合并为一个单元，极性乘以副词强度；
+    - 否定词（no / not / never）使其后的单元极性乘以 -0.5；紧跟在 -ly 副词后时改为否定该副词；
+    - 每个 "!" 把前一个单元的极性放大 1.25 倍（截断到 [-1, 1]）。
+
+    TextBlob 逐 token 维护的“修饰词 / 否定词”两个状态在这里用前向填充整体计算。
+    """
+
+    name = "lexicon"
+
+    # TextBlob find_tokens 的标点集合：只从词的首尾剥离，词中间的保留（如 "mess&#160"）
+    _PUNCT = r""".,;:!?()\[\]{}`@#$^&*+\-|=~_'"“”‘’"""
+
+    def __init__(self):
+        words = list(pattern_lexicon.keys())
+        scores = np.array([pattern_lexicon[w][None] for w in words], dtype=float)  # 各词性平均后的 (极性, 主观性, 强度)
+        self._polarity = dict(zip(words, scores[:, 0]))
+        self._intensity = dict(zip(words, scores[:, 2]))
+        self._modifiers = {w for w in words if any(pos in pattern_lexicon[w] for pos in pattern_lexicon.modifiers)}
+        self._negations = set(pattern_lexicon.negations)
+        punct = self._PUNCT
+        self._emoticons, patterns = {"(!)": 0.0}, [(r"\(\s?!\s?\)", 3)]  # "(!)" 表示反讽，单独记一个 0 分单元
+        for (_, p), group in EMOTICONS.items():
+            for e in group:
+                if not e.isalpha() and len(e) <= 5:  # 与 TextBlob 一致：纯字母的表情（如 xd）不算
+                    pattern = self._emoticon_pattern(e, punct)
+                    if pattern:
+                        self._emoticons[e.lower()] = p
+                        patterns.append((pattern, len(e)))
+        # 先用首字符做前瞻过滤，避免在每个位置都尝试整组表情正则
+        first_chars = "".join(sorted({e[0] for e in self._emoticons} | {"("}))
+        emoticons = rf"(?=[{re.escape(first_chars)}])(?:{'|'.join(p for p, _ in sorted(patterns, key=lambda x: -x[1]))})"
+        # 词只剥离首尾标点，但开头的 "." 不剥离（".thanks" 整体是一个未知词）
+        word = rf"\.*[^\s{punct}](?:[^\s'\"“”‘’]*[^\s{punct}])?"
+        self._token_re = re.compile(rf"{emoticons}|{word}|\.\.\.|[{punct}]")
+
+    @staticmethod
+    def _emoticon_pattern(emoticon, punct):
+        """复刻 TextBlob 的表情识别：首尾标点先被剥离成单独的 token，再用区分大小写的正则拼回（字符间允许一个空格）。
+
+        句子已转小写，所以含大写字母的表情（如 :D）只有在不会被剥离、整体就是一个 token 时才能识别。
+        """
+        boundary = rf"(?=\s|$|[{punct}])"
+        chars = [re.escape(c) for c in emoticon]
+        if emoticon != emoticon.lower():
+            if emoticon[0] in punct or emoticon[-1] in punct:
+                return None
+            return rf"(?<!\S){''.join(chars).lower()}(?!\S)"
+        optional = r"\s?".join(chars)
+        if not all(c in punct for c in emoticon):
+            return rf"(?<!\S){optional}{boundary}"
+        # 全由标点组成的表情：紧贴在词前或词后都会被剥离出来；中间带空格时两侧必然都被剥离过
+        spaced = "|".join(
+            "".join(c + gap for c, gap in zip(chars, gaps + ("",)))
+            for gaps in product(("", r"\s"), repeat=len(chars) - 1) if r"\s" in gaps
+        )
+        return rf"(?<!\S){optional}|{optional}{boundary}" + (f"|{spaced}" if spaced else "")
+
+    def _tokenize(self, sentence):
+        # 与 TextBlob 的缩写替换一致："don't" 切成 do / n / ' / t
+        return self._token_re.findall(sentence.replace("n't", " n't"))
+
+    def polarities(self, sentences):
+        tokens = [self._tokenize(s) for s in sentences]
+        lengths = np.array([len(t) for t in tokens], dtype=np.int64)
+        sid = np.repeat(np.arange(len(sentences)), lengths)
+        sentence_start = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        flat = [t for ts in tokens for t in ts]
+        if not flat:
+            return np.zeros(len(sentences))
+
+        # 词表属性按去重后的 token 计算一次，再按编码展开到全部 token
+        codes, vocab = pd.factorize(pd.Series(flat, dtype=object))
+        vocab = list(vocab)
+        nan = float("nan")
+        polarity = np.array([self._polarity.get(w, nan) for w in vocab])[codes]
+        intensity = np.array([self._intensity.get(w, nan) for w in vocab])[codes]
+        emoticon = np.array([self._emoticons.get(re.sub(r"\s", "", w), nan) for w in vocab])[codes]
+        vocab_modifier = np.array([w in self._modifiers for w in vocab])
+        known = ~np.isnan(polarity)
+        is_emoticon = ~np.isnan(emoticon)
+        is_modifier = vocab_modifier[codes]
+        is_ly = (vocab_modifier & np.array([w.endswith("ly") for w in vocab]))[codes]
+        is_negation = np.array([w in self._negations for w in vocab])[codes] & ~known
+        is_bang = np.array([w == "!" for w in vocab])[codes]
+        length = np.array([len(w) for w in vocab])[codes]
+        stripped_length = np.array([len(w.strip("'")) for w in vocab])[codes]
+
+        # 修饰词状态：已知副词设置，其它已知词或长度 > 2 的未知词清空
+        modifier_clears = (known & ~is_modifier) | (~known & ~is_negation & (length > 2))
+        modifier = _state_before(is_modifier, modifier_clears, sentence_start)
+        # 否定词紧跟在 -ly 副词后（"really not"）时否定该副词所在单元，自身被消耗；否则长度 > 2 时清空修饰词
+        consumed = is_negation & (modifier >= 0) & is_ly[np.maximum(modifier, 0)]
+        modifier = _state_before(is_modifier, modifier_clears | (is_negation & ~consumed & (length > 2)), sentence_start)
+
+        # 否定词状态：否定词设置，已知词（应用后）、被消耗的否定词或有效长度 > 1 的未知词清空
+        negation_clears = known | consumed | (~known & ~is_negation & (stripped_length > 1))
+        negation = _state_before(is_negation & ~consumed, negation_clears, sentence_start)
+
+        modified = known & (modifier >= 0)
+        negated = known & (negation >= 0)
+        # 被否定的词强度取倒数（"not very good" 中 very 的放大变成缩小）
+        effective = np.where(negated, 1.0 / intensity, intensity)
+        value = np.where(modified, np.clip(polarity * effective[np.maximum(modifier, 0)], -1.0, 1.0), polarity)
+        value = np.where(is_emoticon, emoticon, value)
+
+        # 评估单元：未被修饰的已知词或表情开启新单元，被修饰的词并入当前最后一个单元
+        head = (known & ~modified) | is_emoticon
+        n_units = int(head.sum())
+        if n_units == 0:
+            return np.zeros(len(sentences))
+        unit = np.cumsum(head) - 1
+        unit_sid = sid[head]
+        in_unit = (unit >= 0) & (unit_sid[np.maximum(unit, 0)] == sid)
+
+        # 单元极性取最后一个成员的值；任一成员被否定（或被 -ly 副词后的否定词消耗）则整个单元被否定
+        members = np.flatnonzero(known | is_emoticon)
+        last = np.full(n_units, -1)
+        np.maximum.at(last, unit[members], members)
+        unit_polarity = value[last]
+        unit_negated = np.bincount(unit[(negated | consumed) & in_unit], minlength=n_units) > 0
+
+        # 感叹号只放大在它之前已定型的单元（之后再合并进来的词会覆盖极性）
+        bangs = np.flatnonzero(is_bang & in_unit)
+        bangs = bangs[bangs > last[unit[bangs]]]
+        boost = np.bincount(unit[bangs], minlength=n_units)
+        unit_polarity = np.clip(unit_polarity * 1.25 ** boost, -1.0, 1.0)
+        unit_polarity = np.where(unit_negated, unit_polarity * -0.5, unit_polarity)
+
+        total = np.bincount(unit_sid, weights=unit_polarity, minlength=len(sentences))
+        count = np.bincount(unit_sid, minlength=len(sentences))
+        return total / np.maximum(count, 1)
+
+
+SENTIMENT_BACKENDS = {backend.name: backend for backend in (TextBlobBackend, LexiconBackend)}
+
+
+@lru_cache(maxsize=None)
+def get_sentiment_backend(name=DEFAULT_BACKEND):
+    """按名称取后端实例（每个进程只构建一次；进程池里按名称传递，避免序列化词典）"""
+    if name not in SENTIMENT_BACKENDS:
+        raise ValueError(f"未知的情感打分后端：{name}（可选：{', '.join(SENTIMENT_BACKENDS)}）")
+    return SENTIMENT_BACKENDS[name]()
@@ -0,0 +1,113 @@
+"""多个看板进程共享的只读数据：句子明细表与命中矩阵各写一次内存映射文件，之后每个进程只读打开。
+
+- 句子明细表写成只有一个 record batch 的 Arrow IPC 文件（不压缩）。to_pandas 后各列直接引用映射的页面，
+  不复制：数值 / 日期列是只读的 numpy 数组，正文是 Arrow 字符串列，标签列是 category 编码；
+- 命中矩阵的 CSC 数组各写成一个 .npy，用 np.load(mmap_mode='r') 打开。
+
+页面由操作系统的页缓存在进程之间共享：多开几个看板进程，数据只占一份物理内存，各进程自己的内存
+（RssAnon）不随数据增长。打开的对象都是只读的，调用方不能原地修改；pandas 写时复制下赋新列、
+iloc 切片都不会改动原数据。
+
+每个条目是 SHARED_STORE_DIR/<类别>/<归属的指纹>/<键的指纹>/ 下的一个目录：先在临时目录写好再整体改名发布，
+已存在则说明别的进程抢先写好了，直接打开它的，保证所有进程映射的是同一份文件。归属（如数据目录 + 类目）
+下发布了新条目后，同一归属的旧条目随即删除：已经映射了旧文件的进程不受影响（删除只是解除目录项，
+映射的页面在进程释放前一直有效），它们下次按新版本加载时会打开新条目。
+"""
+import os
+import shutil
+import tempfile
+from threading import Lock
+
+import numpy as np
+import pyarrow as pa
+
+from fingerprints import fingerprint
+
+SHARED_STORE_DIR = os.environ.get("SHARED_STORE_DIR", ".shared_store")
+FRAME_FILE = "table.arrow"
+
+_locks_guard = Lock()
+_publish_locks = {}
+
+
+def open_shared(kind, key, build, write, read, scope=None):
+    """打开 (kind, key) 对应的共享条目；不存在时调用 build() 计算、write(目录, 结果) 落盘后再打开。
+
+    key 须可 JSON 序列化，应包含决定内容的全部版本信息（数据版本、词库指纹等）。scope 为条目的归属
+    （可 JSON 序列化）：同一归属同时只保留最新发布的条目，给定 scope 时发布后删除该归属下的其它条目。
+    """
+    scope_dir = os.path.join(SHARED_STORE_DIR, kind)
+    if scope is not None:
+        scope_dir = os.path.join(scope_dir, fingerprint(scope))
+    path = os.path.join(scope_dir, fingerprint([kind, key]))
+    for attempt in range(2):
+        # 同一进程内（如预热线程与用户会话）同一条目只构建一次，后到的等它发布后直接打开
+        with _publish_lock(path):
+            if not os.path.isdir(path):
+                _publish(path, build, write)
+                if scope is not None:
+                    _prune(scope_dir, keep=os.path.basename(path))
+        try:
+            return read(path)
+        except FileNotFoundError:
+            # 刚好被另一个进程发布新条目时删除：重新发布一次
+            if attempt:
+                raise
+
+
+def _publish_lock(path):
+    with _locks_guard:
+        return _publish_locks.setdefault(path, Lock())
+
+
+def _publish(path, build, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=os.path.dirname(path))
+    try:
+        write(tmp, build())
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    try:
+        os.rename(tmp, path)
+    except OSError:
+        # 其它进程已经发布了同一条目：丢弃自己这份，统一映射已发布的文件
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.isdir(path):
+            raise
+
+
+def _prune(scope_dir, keep):
+    """删除归属目录下除 keep 外已发布的条目；其它进程写到一半的临时目录（.tmp）不动"""
+    for name in os.listdir(scope_dir):
+        if name != keep and not name.endswith(".tmp"):
+            # Windows 上仍被映射的文件删不掉，留到下次发布时再删
+            shutil.rmtree(os.path.join(scope_dir, name), ignore_errors=True)
+
+
+def write_frame(path, df):
+    """DataFrame 写成单个 record batch 的 Arrow IPC 文件；分块会让 to_pandas 拼接复制"""
+    table = pa.Table.from_pandas(df, preserve_index=False).combine_chunks()
+    with pa.OSFile(os.path.join(path, FRAME_FILE), 'wb') as f:
+        with pa.ipc.new_file(f, table.schema) as writer:
+            writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+
+
+def read_frame(path):
+    """以内存映射方式读回 write_frame 写出的 DataFrame（零拷贝、只读）"""
+    # 映射随表内的缓冲区一起存活，不能提前关闭
+    table = pa.ipc.open_file(pa.memory_map(os.path.join(path, FRAME_FILE))).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def write_arrays(path, **arrays):
+    for name, array in arrays.items():
+        np.save(os.path.join(path, f"{name}.npy"), np.asarray(array))
+
+
+def read_arrays(path):
+    """{名称: 只读内存映射数组}"""
+    return {
+        name[:-len(".npy")]: np.load(os.path.join(path, name), mmap_mode='r')
+        for name in os.listdir(path) if name.endswith(".npy")
+    }
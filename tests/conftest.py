@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 仓库根目录下的模块没有打包，测试直接从根目录导入（与 benchmarks/ 相同）
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,101 @@
+"""工作簿追加评论后，句子缓存的增量合并与从头重建的结果一致。"""
+from datetime import datetime, timedelta
+from functools import partial
+
+import pandas as pd
+from openpyxl import Workbook
+
+import review_analysis
+from review_analysis import load_sentences
+
+HEADER = ['Content', 'ASIN', 'Rating', 'Helpful', 'Reviews URL', 'Author', 'Date']
+CATEGORY = "儿童丙烯"
+
+
+def review_rows(n, start=0):
+    rows = []
+    for i in range(start, start + n):
+        content = [
+            "Great colors! The tips are very smooth.",
+            "Dried out after a week. Not happy at all :(",
+            "Good for kids. Easy to clean up, but the caps are hard to open.",
+        ][i % 3] + f" Batch {i // 10}."
+        if i % 7 == 0:
+            content = "Great colors! The tips are very smooth."  # 与其它评论正文重复
+        asin = "" if i % 11 == 0 else f"b0{i % 4:02d}abc"
+        rows.append([content, asin, 1 + i % 5, i % 3 or None, f"https://example.com/r/{i}", f"user{i}",
+                     datetime(2024, 1, 1) + timedelta(days=i)])
+    return rows
+
+
+def write_workbook(path, rows):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(HEADER)
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def load(data_dir):
+    return load_sentences(str(data_dir), categories=[CATEGORY], workers=1, sentiment="lexicon", segmenter="fast")
+
+
+def test_appended_workbook_matches_full_rebuild(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    workbook = data_dir / "kids_sales.xlsx"
+    monkeypatch.setattr(review_analysis, "SENTENCE_CACHE_DIR", str(tmp_path / "cache"))
+    write_workbook(workbook, review_rows(40))
+    load(data_dir)
+
+    # 追加评论后重新加载：应复用已有句子，只处理新增评论
+    write_workbook(workbook, review_rows(40) + review_rows(25, start=40))
+    known = []
+    build = review_analysis.build_sentence_table
+
+    def spy(*args, **kwargs):
+        known.append(kwargs['known'])
+        return build(*args, **kwargs)
+
+    monkeypatch.setattr(review_analysis, "build_sentence_table", spy)
+    incremental = load(data_dir)
+    assert len(known) == 1 and known[0] is not None
+
+    monkeypatch.setattr(review_analysis, "SENTENCE_CACHE_DIR", str(tmp_path / "rebuild"))
+    rebuilt = load(data_dir)
+    assert len(rebuilt) > 0
+    pd.testing.assert_frame_equal(incremental, rebuilt)
+
+
+
+def test_peer_workbook_content_is_reused(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    write_workbook(data_dir / "kids_sales.xlsx", review_rows(60))
+    # 趋势榜的评论全部出现在销量榜里（评论者不同），内容应直接从销量榜的缓存复用
+    write_workbook(data_dir / "kids_trending.xlsx",
+                   [row[:5] + [f"other{i}"] + row[6:] for i, row in enumerate(review_rows(30, start=15))])
+    monkeypatch.setattr(review_analysis, "iter_review_batches",
+                        partial(review_analysis.iter_review_batches, batch_size=7))
+    monkeypatch.setattr(review_analysis, "SENTENCE_CACHE_DIR", str(tmp_path / "cache"))
+    analyzed = []
+    analyze = review_analysis.analyze_reviews
+
+    def spy(texts, **kwargs):
+        analyzed.append(len(texts))
+        return analyze(texts, **kwargs)
+
+    monkeypatch.setattr(review_analysis, "analyze_reviews", spy)
+    shared = load(data_dir)
+    sales_calls = len(list(review_analysis.iter_review_batches(str(data_dir / "kids_sales.xlsx"))))
+    assert sum(analyzed[sales_calls:]) == 0
+
+    # 与不复用其它工作簿、逐个从头构建的结果一致
+    for name in ["kids_sales.xlsx", "kids_trending.xlsx"]:
+        monkeypatch.setattr(review_analysis, "SENTENCE_CACHE_DIR", str(tmp_path / name))
+        alone = review_analysis.load_sentence_table(str(data_dir / name), review_analysis.DATA_MAP[name], workers=1,
+                                                    sentiment="lexicon", segmenter="fast")
+        cached = pd.read_parquet(tmp_path / "cache" / f"{name.removesuffix('.xlsx')}.fast.lexicon.parquet")
+        pd.testing.assert_frame_equal(cached, alone)
+    assert len(shared) > 0
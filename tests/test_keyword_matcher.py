@@ -0,0 +1,44 @@
+"""命中矩阵与原来的 `str.contains('|'.join(re.escape(k) ...))` 逐标签匹配对比（区分 / 忽略大小写两种语义）。"""
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from keyword_matcher import compiled_matcher
+
+DICTIONARY = {
+    "颜色": {"鲜艳": ["vibrant", "Bright", "pop"], "暗淡": ["dull", "faded", "Dull"]},
+    "笔头": {"粗细": ["fine tip", "Tip"], "符号": ["c++", "(dot)", "a.b"]},
+    "空白": {"空": ["", "  ", "zzz"]},
+}
+TEXTS = pd.Series([
+    "Bright and vibrant!", "the TIP is a fine tip", "DULL colours, Dull caps", "used c++ and (dot) pens",
+    "axb is not a match", "a.b is", np.nan, "", "Pop Art", "nothing here", "brightly POPPING", "zzz",
+], dtype=object)
+
+
+def tags():
+    return [(dimension, tag) for dimension, sub_dict in DICTIONARY.items() for tag in sub_dict]
+
+
+@pytest.mark.parametrize("exact", [True, False], ids=["区分大小写", "忽略大小写"])
+def test_hit_matrix_matches_str_contains(exact):
+    hits = compiled_matcher(DICTIONARY).hit_matrix(TEXTS)
+    assert hits.n_rows == len(TEXTS)
+    for tag_id, (dimension, tag) in enumerate(tags()):
+        keywords = DICTIONARY[dimension][tag]
+        if exact:
+            expected = TEXTS.str.contains('|'.join(re.escape(k) for k in keywords), na=False)
+        else:
+            # 下钻与气泡图的写法：跳过空白关键词后忽略大小写匹配
+            expected = TEXTS.str.contains('|'.join(re.escape(k) for k in keywords if k.strip()), na=False, flags=re.IGNORECASE)
+        np.testing.assert_array_equal(hits.tag_rows(tag_id, exact=exact), np.flatnonzero(expected), err_msg=f"{dimension}/{tag}")
+
+
+def test_dimension_mask_is_union_of_tags():
+    hits = compiled_matcher(DICTIONARY).hit_matrix(TEXTS)
+    for dimension, sub_dict in DICTIONARY.items():
+        keywords = [k for tag_keywords in sub_dict.values() for k in tag_keywords if k.strip()]
+        expected = TEXTS.str.contains('|'.join(re.escape(k) for k in keywords), na=False, flags=re.IGNORECASE)
+        np.testing.assert_array_equal(hits.mask(hits.dimension_tag_ids(dimension)), expected.to_numpy())
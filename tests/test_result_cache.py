@@ -0,0 +1,31 @@
+"""结果缓存：磁盘层按字节数上限淘汰最久未用的条目，内存层不序列化即可估算大小。"""
+import os
+
+import numpy as np
+
+from result_cache import ResultCache, _digest, estimate_bytes
+
+
+def disk_path(cache, key):
+    return cache._disk_path(_digest([cache.name, key]))
+
+
+def test_disk_tier_is_bounded_and_lru(tmp_path):
+    value = np.zeros(1000)  # 每条约 8KB
+    cache = ResultCache("t", disk_dir=str(tmp_path), max_disk_bytes=3 * 8500)
+    for i in range(3):
+        cache.get_or_compute(["k", i], lambda: value)
+        os.utime(disk_path(cache, ["k", i]), ns=(i, i))  # 固定先后，不依赖文件系统的时间精度
+
+    # 另一个进程（内存层为空）从磁盘读到 k0，刷新了它的修改时间
+    assert ResultCache("t", disk_dir=str(tmp_path)).get_or_compute(["k", 0], lambda: None) is not None
+    cache.get_or_compute(["k", 3], lambda: value)
+
+    assert len(os.listdir(cache.disk_dir)) == 3
+    assert os.path.exists(disk_path(cache, ["k", 0]))
+    assert not os.path.exists(disk_path(cache, ["k", 1]))
+    assert cache.stats()['disk_evictions'] == 1
+
+
+def test_memory_size_is_estimated_without_pickling():
+    assert estimate_bytes({'a': np.zeros(1000), 'b': [np.zeros(500)]}) >= 12000
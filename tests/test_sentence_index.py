@@ -0,0 +1,100 @@
+"""SentenceIndex.search 与直接的 pandas 筛选对比：分区、缺失星级、短语、排序与分页。"""
+from itertools import product
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sentence_index import SentenceIndex, tokenize
+
+TEXTS = [
+    "the markers dry out fast.", "dry outside but fine inside.", "they dry, out of the box!", "colors pop.",
+    "the tips dry out and the caps crack.", "", "out dry", "dry out", "great for kids", "the caps crack easily.",
+]
+
+
+def sentence_table(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    rating = rng.choice([1, 2, 3, 4, 5, np.nan], n).astype(float)
+    dates = pd.Series(pd.to_datetime("2024-01-01") + pd.to_timedelta(rng.integers(0, 400, n), unit="D"), dtype=object)
+    dates[rng.random(n) < 0.2] = np.nan  # object 列：拼接了空工作簿的类目就是这样
+    return pd.DataFrame({
+        's_text': rng.choice(TEXTS, n),
+        'sub_type': rng.choice(["🔥 高销量", "📈 高增长趋势"], n),
+        'Rating': rating,
+        'Helpful': np.where(rng.random(n) < 0.3, np.nan, rng.integers(0, 5, n)),
+        'Date': dates,
+    })
+
+
+def reference(df, sub_type, ratings=None, query=None, rows=None, sort=None):
+    mask = df['sub_type'] == sub_type
+    if ratings is not None:
+        mask &= df['Rating'].isin(ratings)
+    if rows is not None:
+        mask &= df.index.isin(rows)
+    if query is not None:
+        terms = tokenize(query)
+        tokens = df['s_text'].map(tokenize)
+        mask &= tokens.map(lambda t: bool(terms) and any(t[i:i + len(terms)] == terms for i in range(len(t))))
+    result = df[mask]
+    if sort is not None:
+        key = pd.to_datetime(result[sort], errors='coerce') if sort == 'Date' else result[sort]
+        result = result.assign(_key=key).sort_values('_key', ascending=False, kind='stable', na_position='last')
+    return result.index.to_numpy()
+
+
+@pytest.fixture(scope="module")
+def table():
+    return sentence_table()
+
+
+@pytest.fixture(scope="module")
+def index(table):
+    return SentenceIndex(table)
+
+
+@pytest.mark.parametrize("sub_type, ratings, query, sort", list(product(
+    ["🔥 高销量", "📈 高增长趋势", "不存在"],
+    [None, [1, 2, 3], [5]],
+    [None, "dry", "dry out", "caps crack", "Out", "!!!", "zzz"],
+    [None, 'Helpful', 'Date'],
+)))
+def test_search_matches_pandas(table, index, sub_type, ratings, query, sort):
+    expected = reference(table, sub_type, ratings, query, sort=sort)
+    np.testing.assert_array_equal(index.search(sub_type, ratings=ratings, query=query, sort=sort), expected)
+
+
+@pytest.mark.parametrize("query", [None, "dry out"])
+def test_candidate_rows(table, index, query):
+    rows = np.flatnonzero(table['s_text'].str.contains("caps|dry").to_numpy())
+    expected = reference(table, "🔥 高销量", [1, 2, 3], query, rows=rows)
+    np.testing.assert_array_equal(index.search("🔥 高销量", ratings=[1, 2, 3], query=query, rows=rows), expected)
+
+
+def test_unrated_rows_stay_in_their_own_partition(table, index):
+    # 缺失星级不能落进相邻子类的最高星级分区
+    for sub_type in table['sub_type'].unique():
+        for ratings in ([5], [1, 2, 3]):
+            found = index.search(sub_type, ratings=ratings)
+            assert table.loc[found, 'Rating'].notna().all()
+            assert (table.loc[found, 'sub_type'] == sub_type).all()
+    unrated = index.search("🔥 高销量")
+    assert table.loc[unrated, 'Rating'].isna().any()
+
+
+def test_phrase_matches_whole_words(index, table):
+    found = table.loc[index.search("🔥 高销量", query="dry out"), 's_text']
+    assert not found.str.contains("outside").any()
+    assert not found.isin(["out dry"]).any()
+
+
+@pytest.mark.parametrize("sort", [None, 'Date'])
+def test_paging_over_distinct_voices(table, index, sort):
+    rows = index.search("📈 高增长趋势", ratings=[1, 2, 3], sort=sort)
+    voices = index.distinct(rows)
+    expected = table.loc[rows, ['Rating', 's_text']].drop_duplicates()
+    np.testing.assert_array_equal(voices, expected.index.to_numpy())
+    page_size = 4
+    pages = [index.frame.iloc[voices[p * page_size:(p + 1) * page_size]] for p in range(-(-len(voices) // page_size))]
+    pd.testing.assert_frame_equal(pd.concat(pages), index.frame.iloc[voices])
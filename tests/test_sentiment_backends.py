@@ -0,0 +1,28 @@
+"""LexiconBackend 与 TextBlob 参考实现逐句对比：每条 TextBlob 规则至少有一句覆盖。"""
+import numpy as np
+import pytest
+
+from sentiment_backends import LexiconBackend, TextBlobBackend
+
+# 情感后端的输入是已转小写的句子
+SENTENCES = {
+    "词典词": ["these markers are good.", "the box arrived on tuesday.", ""],
+    "程度副词": ["the colors are very good.", "the tips are extremely bad and really disappointing."],
+    "否定词": [
+        "not good at all.",
+        "the paint is not very vibrant.",
+        "not really happy with the set.",
+        "i would never buy these again, terrible quality.",
+        "absolutely amazing colors, not disappointed.",
+    ],
+    "感叹号": ["good!", "great!!!", "awful quality!", "no complaints, super smooth and bright!"],
+    "表情": ["love them :)", "they dried out :(", "works fine :-) but the cap broke :-(", "nice (!)"],
+}
+
+
+@pytest.mark.parametrize("rule", list(SENTENCES))
+def test_lexicon_matches_textblob(rule):
+    sentences = SENTENCES[rule]
+    np.testing.assert_allclose(
+        LexiconBackend().polarities(sentences), TextBlobBackend().polarities(sentences), rtol=0, atol=1e-9,
+    )
@@ -0,0 +1,33 @@
+"""词云磁盘缓存：超过字节数上限时删除最久未用的词云。"""
+import os
+
+import pandas as pd
+
+import wordcloud_cache
+from wordcloud_cache import cached_wordcloud
+
+STYLE = dict(stopwords=set(), max_words=20, random_state=1, colormap='Greens', width=120, height=80)
+
+
+def test_disk_cache_is_bounded_and_lru(tmp_path, monkeypatch):
+    monkeypatch.setattr(wordcloud_cache, "WORDCLOUD_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(wordcloud_cache, "MEMORY_CACHE_SIZE", 0)  # 每次都走磁盘
+    corpora = [pd.Series([f"bright smooth colors batch{i} " * 5]) for i in range(4)]
+
+    keys = []
+    for i, corpus in enumerate(corpora[:3]):
+        before = set(os.listdir(tmp_path))
+        cached_wordcloud(corpus, **STYLE)
+        keys.append({name.split(".")[0] for name in set(os.listdir(tmp_path)) - before}.pop())
+        for ext in (".png", ".json"):
+            os.utime(tmp_path / (keys[-1] + ext), ns=(i, i))  # 固定先后，不依赖文件系统的时间精度
+    # 上限放得下三条、放不下四条
+    three_entries = sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path))
+    monkeypatch.setattr(wordcloud_cache, "DISK_CACHE_BYTES", int(three_entries * 1.2))
+
+    cached_wordcloud(corpora[0], **STYLE)  # 读取命中：最早的一条变成最近使用
+    cached_wordcloud(corpora[3], **STYLE)  # 写入后超出上限：删除最久未用的 keys[1]
+
+    remaining = {name.split(".")[0] for name in os.listdir(tmp_path)}
+    assert len(remaining) == 3
+    assert keys[0] in remaining and keys[2] in remaining and keys[1] not in remaining
@@ -0,0 +1,80 @@
+"""分句与情感打分流水线。
+
+独立成模块是为了让进程池 worker 能直接导入这些函数（Streamlit 脚本本身无法被子进程 import）。
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+
+import nltk
+import numpy as np
+
+from segmentation import DEFAULT_SEGMENTER, segment_reviews
+from sentiment_backends import DEFAULT_BACKEND, get_sentiment_backend
+
+
+def init_nltk_resources():
+    """确保 punkt 分句模型可用，缺失时自动下载"""
+    resources = ['punkt', 'punkt_tab']
+    for res in resources:
+        try:
+            # 检查资源是否存在
+            nltk.data.find(f'tokenizers/{res}')
+        except LookupError:
+            # 不存在则下载
+            nltk.download(res)
+
+
+# 每个分片包含的评论条数：太小则进程间通信开销占比高，太大则尾部负载不均
+DEFAULT_CHUNK_SIZE = 200
+
+
+def _analyze_chunk(texts, sentiment=DEFAULT_BACKEND, segmenter=DEFAULT_SEGMENTER):
+    """一批评论：整批分句后把全部句子一次交给情感后端打分，再按评论切回"""
+    review_idx, _, sentences = segment_reviews(texts, segmenter)
+    polarities = get_sentiment_backend(sentiment).polarities(sentences)
+    # segment_reviews 按评论顺序输出句子，按每条评论的句数切回即可
+    bounds = np.cumsum(np.bincount(review_idx, minlength=len(texts)))
+    results, start = [], 0
+    for end in bounds:
+        results.append([{'text': s, 'polarity': float(p)} for s, p in zip(sentences[start:end], polarities[start:end])])
+        start = end
+    return results
+
+
+@contextmanager
+def review_pool(workers=1):
+    """可在多个批次间复用的进程池；workers <= 1 时给出 None，调用方走串行路径"""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        yield None
+        return
+    # Streamlit 进程内有大量线程，fork 容易继承到被占用的锁，这里统一用 spawn
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        yield pool
+
+
+def analyze_reviews(texts, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, pool=None, sentiment=DEFAULT_BACKEND,
+                    segmenter=DEFAULT_SEGMENTER):
+    """批量处理评论，返回与输入顺序一致的结果列表。
+
+    workers <= 1 时走串行路径；否则按 chunk_size 分片交给进程池（传入 pool 时复用该进程池），
+    并行与串行调用的是同一个 _analyze_chunk，结果逐条一致。sentiment / segmenter 为情感后端与分句器名称。
+    """
+    texts = list(texts)
+    analyze = partial(_analyze_chunk, sentiment=sentiment, segmenter=segmenter)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if (pool is None and workers <= 1) or len(texts) <= chunk_size:
+        return analyze(texts)
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    if pool is not None:
+        return [r for part in pool.map(analyze, chunks) for r in part]
+
+    with review_pool(min(workers, len(chunks))) as own_pool:
+        # map 按提交顺序返回，保证与输入顺序一致
+        return [r for part in own_pool.map(analyze, chunks) for r in part]
@@ -0,0 +1,91 @@
+"""服务启动时的缓存预热。
+
+看板进程第一次执行 app.py 时调用 start_warm_up()：后台守护线程按优先级依次执行预热任务。任务就是调用看板
+自己的缓存加载器，预热结果与用户请求命中的是同一份缓存。st.cache_data、result_cache 与词云缓存都按键加锁，
+同一条目不会被并发重复计算：用户请求的条目如果正在预热，会等这次计算完成后直接取用，其余条目照常计算。
+进度由 WarmUp.progress() 提供，看板侧边栏展示。设置 WARM_UP_ON_START=0 可关闭。
+
+部署时也可以在启动看板之前（或同时）另起一个进程，先把各类目的磁盘缓存建好：
+    python warm_up.py
+    python warm_up.py --categories 儿童丙烯 --workers 4
+"""
+import argparse
+import os
+import time
+from threading import Lock, Thread
+
+WARM_UP_ON_START = os.environ.get("WARM_UP_ON_START", "1") != "0"
+
+_current = None
+_lock = Lock()
+
+
+class WarmUp:
+    """一轮预热：按顺序执行 [(说明, 函数)] 并记录进度；单个任务失败只记录下来，用户访问时会照常重新计算"""
+
+    def __init__(self, key, tasks):
+        self.key = key
+        self.tasks = list(tasks)
+        self.done = 0
+        self.current = None
+        self.errors = {}
+        self.started_at = time.time()
+        self.finished_at = None
+
+    @property
+    def running(self):
+        return self.finished_at is None
+
+    def run(self):
+        for label, task in self.tasks:
+            self.current = label
+            try:
+                task()
+            except Exception as e:  # noqa: BLE001 -- 预热是尽力而为，不能让一个任务拖垮整轮
+                self.errors[label] = repr(e)
+            self.done += 1
+        self.current = None
+        self.finished_at = time.time()
+
+    def progress(self):
+        return {
+            'done': self.done,
+            'total': len(self.tasks),
+            'current': self.current,
+            'running': self.running,
+            'seconds': round((self.finished_at or time.time()) - self.started_at, 1),
+            'errors': dict(self.errors),
+        }
+
+
+def start_warm_up(key, make_tasks):
+    """启动一轮后台预热并返回它。
+
+    key 为数据与词库的版本：同一 key 已经预热过（或正在预热）时直接返回那一轮；版本变化后、
+    上一轮结束时才开始新的一轮。make_tasks() 返回按优先级排列的 [(说明, 函数)]，只在真正启动时调用。
+    """
+    global _current
+    with _lock:
+        if _current is None or (_current.key != key and not _current.running):
+            _current = WarmUp(key, make_tasks())
+            Thread(target=_current.run, name="cache-warm-up", daemon=True).start()
+        return _current
+
+
+def main(argv=None):
+    from review_analysis import INGEST_WORKERS, available_categories, warm_up_categories
+
+    parser = argparse.ArgumentParser(description="预热各类目的磁盘缓存（句子缓存、按维度的命中矩阵与画像列）")
+    parser.add_argument('--data-dir', default=".", help="工作簿所在目录")
+    parser.add_argument('--categories', nargs='+', default=None, help="只预热指定类目，默认全部")
+    parser.add_argument('--workers', type=int, default=INGEST_WORKERS, help="分句打分的进程数")
+    args = parser.parse_args(argv)
+
+    for category in args.categories or available_categories(args.data_dir):
+        start = time.perf_counter()
+        warm_up_categories([category], args.data_dir, workers=args.workers)
+        print(f"{category}: {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
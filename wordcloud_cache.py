@@ -0,0 +1,141 @@
+"""词云缓存：按语料指纹 + 渲染参数缓存词频表与渲染结果（内存 LRU + 磁盘 PNG）。
+
+与筛选无关的控件交互（切换画像、选择痛点维度）触发 rerun 时，词云直接命中缓存，不再拼接全文重算。
+磁盘缓存有字节数上限（WORDCLOUD_CACHE_MB）：数据或词库更新后旧版本的词云不再被读取，超出上限时按修改时间
+删除最久未用的条目（读取命中时刷新修改时间）。
+"""
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+from wordcloud import WordCloud
+
+from fingerprints import corpus_fingerprint
+
+WORDCLOUD_CACHE_DIR = os.environ.get("WORDCLOUD_CACHE_DIR", ".wordcloud_cache")
+MEMORY_CACHE_SIZE = 32
+DISK_CACHE_BYTES = int(os.environ.get("WORDCLOUD_CACHE_MB", 64)) * 2**20
+
+_memory = OrderedDict()
+_lock = Lock()
+_key_locks = {}
+
+
+def _memory_get(key):
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key]
+    return None
+
+
+def _memory_put(key, value):
+    with _lock:
+        _memory[key] = value
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+
+def cached_wordcloud(texts, stopwords, max_words, random_state, colormap,
+                     width=500, height=400, background_color='white', collocations=True, min_chars=30):
+    """返回 (词云 RGB 数组, 词频表)；拼接后的语料不超过 min_chars 个有效字符时返回 (None, {})"""
+    params = {
+        'corpus': corpus_fingerprint(texts),
+        'stopwords': sorted(stopwords),
+        'max_words': max_words, 'random_state': random_state, 'colormap': colormap,
+        'width': width, 'height': height, 'background_color': background_color,
+        'collocations': collocations, 'min_chars': min_chars,
+    }
+    key = hashlib.sha256(json.dumps(params, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+    cached = _memory_get(key)
+    if cached is not None:
+        return cached
+
+    # 同一张词云只生成一次：后台预热与用户请求同时到达时，后到的等待先到的生成完直接取结果
+    with _lock:
+        key_lock = _key_locks.setdefault(key, Lock())
+    with key_lock:
+        result = _memory_get(key)
+        if result is None:
+            result = _load_or_render(key, texts, params, stopwords)
+            _memory_put(key, result)
+    with _lock:
+        _key_locks.pop(key, None)
+    return result
+
+
+def _load_or_render(key, texts, params, stopwords):
+    """读磁盘缓存，没有则生成并落盘"""
+    png_path = os.path.join(WORDCLOUD_CACHE_DIR, f"{key}.png")
+    freq_path = os.path.join(WORDCLOUD_CACHE_DIR, f"{key}.json")
+    result = None
+    if os.path.exists(freq_path):
+        try:
+            with open(freq_path, encoding='utf-8') as f:
+                frequencies = json.load(f)
+            image = np.array(Image.open(png_path)) if frequencies else None
+            result = (image, frequencies)
+            os.utime(freq_path)  # 刷新修改时间，淘汰时视为最近使用
+        except (OSError, ValueError):
+            result = None  # 缓存损坏时重新生成
+
+    if result is None:
+        # 增加清洗：转小写，防止因为大小写导致重复
+        text = " ".join(pd.Series(texts, dtype=object).astype(str).str.lower().tolist())
+        if len(text.strip()) > params['min_chars']:
+            wc = WordCloud(
+                width=params['width'], height=params['height'], background_color=params['background_color'],
+                colormap=params['colormap'], max_words=params['max_words'], stopwords=stopwords,
+                collocations=params['collocations'], random_state=params['random_state'],
+            )
+            # 与 WordCloud.generate() 等价：先统计词频，再按词频布局渲染
+            frequencies = wc.process_text(text)
+            image = wc.generate_from_frequencies(frequencies).to_array()
+        else:
+            frequencies, image = {}, None
+        result = (image, frequencies)
+
+        os.makedirs(WORDCLOUD_CACHE_DIR, exist_ok=True)
+        if image is not None:
+            Image.fromarray(image).save(png_path + ".tmp", format="PNG")
+            os.replace(png_path + ".tmp", png_path)
+        with open(freq_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(frequencies, f, ensure_ascii=False)
+        os.replace(freq_path + ".tmp", freq_path)
+        _prune(keep=key)
+    return result
+
+
+def _prune(keep, max_bytes=None):
+    """磁盘缓存超过上限时按词频表的修改时间删除最久未用的词云（PNG 与词频表一起删，刚写入的保留）"""
+    max_bytes = DISK_CACHE_BYTES if max_bytes is None else max_bytes
+    entries = {}
+    for name in os.listdir(WORDCLOUD_CACHE_DIR):
+        key, ext = os.path.splitext(name)
+        if ext not in (".png", ".json"):
+            continue
+        try:
+            stat = os.stat(os.path.join(WORDCLOUD_CACHE_DIR, name))
+        except OSError:
+            continue
+        mtime, size = entries.get(key, (0, 0))
+        entries[key] = (max(mtime, stat.st_mtime_ns) if ext == ".json" else mtime, size + stat.st_size)
+    total = sum(size for _, size in entries.values())
+    for key, (_, size) in sorted(entries.items(), key=lambda item: item[1][0]):
+        if total <= max_bytes:
+            break
+        if key == keep:
+            continue
+        for ext in (".png", ".json"):
+            try:
+                os.remove(os.path.join(WORDCLOUD_CACHE_DIR, key + ext))
+            except OSError:
+                pass  # 其它进程已经删除
+        total -= size